@@ -1,4 +1,12 @@
-from .server import serve
+from .cache import DEFAULT_CONTENT_CACHE_BYTES, DEFAULT_CONTENT_CACHE_TTL
+from .disk_cache import DEFAULT_DISK_CACHE_BYTES
+from .robots import DEFAULT_ROBOTS_TXT_TTL
+from .server import (
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    serve,
+)
 
 
 def main():
@@ -15,9 +23,82 @@ def main():
         action="store_true",
         help="Ignore robots.txt restrictions",
     )
+    parser.add_argument(
+        "--robots-txt-ttl",
+        type=float,
+        default=DEFAULT_ROBOTS_TXT_TTL,
+        help="Seconds a robots.txt is cached when its headers don't say (0 disables)",
+    )
+    parser.add_argument(
+        "--content-cache-bytes",
+        type=int,
+        default=DEFAULT_CONTENT_CACHE_BYTES,
+        help="Memory budget for fetched pages kept for start_index continuations (0 disables)",
+    )
+    parser.add_argument(
+        "--content-cache-ttl",
+        type=float,
+        default=DEFAULT_CONTENT_CACHE_TTL,
+        help="Seconds a fetched page is kept for start_index continuations (0 disables)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory to keep fetched pages in across restarts (default: no on-disk cache)",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_DISK_CACHE_BYTES,
+        help="Approximate size limit of the on-disk cache",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        help="Maximum number of open HTTP connections",
+    )
+    parser.add_argument(
+        "--max-keepalive-connections",
+        type=int,
+        default=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        help="Maximum number of idle HTTP connections kept open for reuse",
+    )
+    parser.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=DEFAULT_KEEPALIVE_EXPIRY,
+        help="Seconds an idle HTTP connection is kept open",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 where servers support it (requires the http2 extra)",
+    )
 
     args = parser.parse_args()
-    asyncio.run(serve(args.user_agent, args.ignore_robots_txt))
+    if args.http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            parser.error(
+                "--http2 requires the h2 package; install it with: pip install \"mcp-server-fetch[http2]\""
+            )
+    asyncio.run(
+        serve(
+            args.user_agent,
+            args.ignore_robots_txt,
+            max_connections=args.max_connections,
+            max_keepalive_connections=args.max_keepalive_connections,
+            keepalive_expiry=args.keepalive_expiry,
+            http2=args.http2,
+            robots_txt_ttl=args.robots_txt_ttl,
+            content_cache_bytes=args.content_cache_bytes,
+            content_cache_ttl=args.content_cache_ttl,
+            cache_dir=args.cache_dir,
+            cache_max_bytes=args.cache_max_bytes,
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+import sys
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+
+DEFAULT_CONTENT_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_CONTENT_CACHE_TTL = 300.0
+
+
+def parse_cache_control(value: str) -> dict[str, str | None]:
+    """Split a Cache-Control header into its directives.
+
+    Args:
+        value: Cache-Control header value, e.g. 'public, max-age=600'
+
+    Returns:
+        Lowercased directive names mapped to their argument, or None for bare directives
+    """
+    directives: dict[str, str | None] = {}
+    for part in value.split(","):
+        name, sep, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') if sep else None
+    return directives
+
+
+def parse_http_date(value: str | None) -> float | None:
+    """Convert an HTTP date header to a Unix timestamp, None if missing or malformed"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> float | None:
+    """How long a response may be reused without revalidation (RFC 9111).
+
+    Args:
+        headers: Response headers, looked up case-insensitively as httpx.Headers are
+
+    Returns:
+        Seconds the response stays fresh from now, or None if the headers do
+        not say, leaving the choice to the caller
+    """
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    age = _delta_seconds(headers.get("age")) or 0
+    max_age = _delta_seconds(directives.get("max-age"))
+    if max_age is not None:
+        return float(max(0, max_age - age))
+    if "expires" in headers:
+        expires = parse_http_date(headers["expires"])
+        if expires is None:
+            # An invalid Expires (commonly "0") means already expired
+            return 0.0
+        date = parse_http_date(headers.get("date")) or time.time()
+        return max(0.0, expires - date - age)
+    return None
+
+
+def _delta_seconds(value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return None
+
+
+class ContentCache:
+    """Processed pages by (url, raw, user_agent), the least recently used evicted first.
+
+    Reading a long page takes one fetch call per max_length window; with the
+    page cached, every call after the first is a slice of the same text
+    instead of a fresh download and extraction. Entries are dropped ttl
+    seconds after they were fetched, and the oldest are evicted to keep the
+    total size within max_bytes. A max_bytes or ttl of zero disables the cache.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CONTENT_CACHE_BYTES,
+        ttl: float = DEFAULT_CONTENT_CACHE_TTL,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: OrderedDict[tuple[str, bool, str], tuple[float, int, tuple[str, str]]] = OrderedDict()
+
+    def get(self, url: str, raw: bool, user_agent: str) -> tuple[str, str] | None:
+        """Return the cached (content, prefix) for a fetch, None if missing or expired"""
+        key = (url, raw, user_agent)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, _, page = entry
+        if time.monotonic() >= expires:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return page
+
+    def put(self, url: str, raw: bool, user_agent: str, page: tuple[str, str]) -> None:
+        key = (url, raw, user_agent)
+        size = sum(sys.getsizeof(text) for text in page)
+        if key in self._entries:
+            self._remove(key)
+        if self.ttl <= 0 or size > self.max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, size, page)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: tuple[str, bool, str]) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
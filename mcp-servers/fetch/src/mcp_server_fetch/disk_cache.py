@@ -0,0 +1,169 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping
+
+from .cache import freshness_lifetime, parse_cache_control
+
+DEFAULT_DISK_CACHE_BYTES = 256 * 1024 * 1024
+DISK_CACHE_FILE = "fetch-cache.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    content_type TEXT NOT NULL,
+    body TEXT NOT NULL,
+    markdown TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+
+
+@dataclass
+class CachedResponse:
+    """A response body stored on disk, with what is needed to revalidate it."""
+
+    url: str
+    content_type: str
+    body: str
+    # Extracted markdown, once the body has been simplified
+    markdown: str | None
+    etag: str | None
+    last_modified: str | None
+    # Unix time until which the body may be used without asking the server
+    expires: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def is_storable(status_code: int, headers: Mapping[str, str]) -> bool:
+    """Whether a response may be kept in the disk cache"""
+    if status_code != 200:
+        return False
+    if "no-store" in parse_cache_control(headers.get("cache-control", "")):
+        return False
+    return headers.get("vary", "").strip() != "*"
+
+
+class DiskCache:
+    """Fetched pages kept across restarts in a SQLite database under cache_dir.
+
+    Each URL's body is stored with its ETag and Last-Modified validators and
+    the expiry its Cache-Control or Expires headers give; a response that
+    gives none is stored already stale. A fresh body is reused without a
+    request; a stale one is revalidated with a conditional request, and a
+    304 answer keeps both the body and the markdown extracted from it. The
+    least recently used pages are evicted to keep the file within max_bytes.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = DEFAULT_DISK_CACHE_BYTES):
+        self.path = Path(cache_dir).expanduser() / DISK_CACHE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(self.path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, url: str) -> CachedResponse | None:
+        row = self._conn.execute(
+            "SELECT url, content_type, body, markdown, etag, last_modified, expires"
+            " FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time.time(), url))
+        return CachedResponse(*row)
+
+    def put(
+        self, url: str, status_code: int, headers: Mapping[str, str], body: str
+    ) -> CachedResponse | None:
+        """Store a response if its headers allow it, replacing any earlier one"""
+        if not is_storable(status_code, headers):
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            return None
+        response = CachedResponse(
+            url,
+            headers.get("content-type", ""),
+            body,
+            None,
+            headers.get("etag"),
+            headers.get("last-modified"),
+            _expires(headers),
+        )
+        size = len(url) + len(body)
+        if size > self.max_bytes:
+            return None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses"
+            " (url, content_type, body, markdown, etag, last_modified, expires, accessed, size)"
+            " VALUES (?, ?, ?, NULL, ?, ?, ?, ?, ?)",
+            (
+                url,
+                response.content_type,
+                body,
+                response.etag,
+                response.last_modified,
+                response.expires,
+                time.time(),
+                size,
+            ),
+        )
+        self._evict()
+        return response
+
+    def refresh(self, response: CachedResponse, headers: Mapping[str, str]) -> None:
+        """Record a 304 Not Modified: the stored body is current again"""
+        response.expires = _expires(headers)
+        # A 304 carries the validators the stored body now answers to
+        response.etag = headers.get("etag", response.etag)
+        response.last_modified = headers.get("last-modified", response.last_modified)
+        self._conn.execute(
+            "UPDATE responses SET expires = ?, etag = ?, last_modified = ? WHERE url = ?",
+            (response.expires, response.etag, response.last_modified, response.url),
+        )
+
+    def set_markdown(self, response: CachedResponse, markdown: str) -> None:
+        response.markdown = markdown
+        self._conn.execute(
+            "UPDATE responses SET markdown = ?, size = size + ? WHERE url = ?",
+            (markdown, len(markdown), response.url),
+        )
+        self._evict()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT coalesce(sum(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for url, size in self._conn.execute("SELECT url, size FROM responses ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((url,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+
+
+def _expires(headers: Mapping[str, str]) -> float:
+    return time.time() + (freshness_lifetime(headers) or 0.0)
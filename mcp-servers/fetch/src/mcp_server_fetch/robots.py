@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from protego import Protego
+
+DEFAULT_ROBOTS_TXT_TTL = 3600.0
+# RFC 9309: a cached robots.txt should not be used for more than 24 hours
+MAX_ROBOTS_TXT_TTL = 86400.0
+DEFAULT_ROBOTS_TXT_CACHE_SIZE = 512
+
+
+@dataclass
+class RobotsTxt:
+    """The outcome of fetching one origin's robots.txt."""
+
+    url: str
+    status_code: int
+    text: str
+    # None when the file does not restrict anything (e.g. it returned 404)
+    parser: Protego | None
+    # Freshness lifetime from the response's cache headers, None if they gave none
+    max_age: float | None = None
+
+    @property
+    def denied(self) -> bool:
+        """Whether access to the robots.txt itself was refused, which forbids autonomous fetching"""
+        return self.status_code in (401, 403)
+
+    def can_fetch(self, url: str, user_agent: str) -> bool:
+        if self.denied:
+            return False
+        return self.parser is None or self.parser.can_fetch(url, user_agent)
+
+
+def parse_robots_txt(text: str) -> Protego:
+    """Parse a robots.txt file, ignoring comment lines"""
+    return Protego.parse(
+        "\n".join(line for line in text.splitlines() if not line.strip().startswith("#"))
+    )
+
+
+class RobotsTxtCache:
+    """Parsed robots.txt files by URL, the least recently used evicted first.
+
+    Each outcome is kept for as long as its Cache-Control or Expires headers
+    allow, or for ttl seconds if they say nothing, and never for more than
+    a day. Concurrent lookups of the same robots.txt share one request, even
+    when its outcome may not be kept. A ttl of zero disables the cache.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_ROBOTS_TXT_TTL,
+        capacity: int = DEFAULT_ROBOTS_TXT_CACHE_SIZE,
+    ):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._entries: OrderedDict[str, tuple[float, RobotsTxt]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[RobotsTxt]] = {}
+
+    async def get(self, url: str, load: Callable[[], Awaitable[RobotsTxt]]) -> RobotsTxt:
+        """Return the cached robots.txt at url, calling load to fetch it when missing or expired"""
+        entry = self._entries.get(url)
+        if entry is not None:
+            expires, robots = entry
+            if time.monotonic() < expires:
+                self._entries.move_to_end(url)
+                return robots
+            del self._entries[url]
+
+        pending = self._inflight.get(url)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load(url, load))
+            self._inflight[url] = pending
+            pending.add_done_callback(lambda done: self._finished(url, done))
+        # One caller giving up must not cancel the request the others wait on
+        return await asyncio.shield(pending)
+
+    async def _load(self, url: str, load: Callable[[], Awaitable[RobotsTxt]]) -> RobotsTxt:
+        robots = await load()
+        ttl = min(self.ttl if robots.max_age is None else robots.max_age, MAX_ROBOTS_TXT_TTL)
+        if self.ttl > 0 and ttl > 0 and self.capacity > 0:
+            self._entries[url] = (time.monotonic() + ttl, robots)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return robots
+
+    def _finished(self, url: str, done: asyncio.Future[RobotsTxt]) -> None:
+        self._inflight.pop(url, None)
+        if not done.cancelled():
+            # Mark a failure as retrieved even if every caller has given up
+            done.exception()
@@ -1,8 +1,9 @@
-from typing import Annotated, Tuple
+from typing import Annotated, Awaitable, Tuple
 from urllib.parse import urlparse, urlunparse
 
 import markdownify
 import readabilipy.simple_json
+from httpx import AsyncClient, HTTPError, Limits
 from mcp.shared.exceptions import McpError
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -17,12 +18,24 @@ from mcp.types import (
     INVALID_PARAMS,
     INTERNAL_ERROR,
 )
-from protego import Protego
 from pydantic import BaseModel, Field, AnyUrl
 
+from .cache import (
+    DEFAULT_CONTENT_CACHE_BYTES,
+    DEFAULT_CONTENT_CACHE_TTL,
+    ContentCache,
+    freshness_lifetime,
+)
+from .disk_cache import DEFAULT_DISK_CACHE_BYTES, DiskCache
+from .robots import DEFAULT_ROBOTS_TXT_TTL, RobotsTxt, RobotsTxtCache, parse_robots_txt
+
 DEFAULT_USER_AGENT_AUTONOMOUS = "ModelContextProtocol/1.0 (Autonomous; +https://github.com/modelcontextprotocol/servers)"
 DEFAULT_USER_AGENT_MANUAL = "ModelContextProtocol/1.0 (User-Specified; +https://github.com/modelcontextprotocol/servers)"
 
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
 
 def extract_content_from_html(html: str) -> str:
     """Extract and convert HTML content to Markdown format.
@@ -63,84 +76,168 @@ def get_robots_txt_url(url: str) -> str:
     return robots_url
 
 
-async def check_may_autonomously_fetch_url(url: str, user_agent: str) -> None:
+def create_http_client(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    http2: bool = False,
+) -> AsyncClient:
+    """Create the HTTP client shared by every request the server makes.
+
+    Connections are kept alive and reused per host, so repeated fetches from
+    one site skip the DNS lookup and the TCP and TLS handshakes.
+
+    Args:
+        max_connections: Maximum number of open connections
+        max_keepalive_connections: Maximum number of idle connections kept for reuse
+        keepalive_expiry: Seconds an idle connection is kept before being closed
+        http2: Whether to negotiate HTTP/2 (requires the http2 extra)
+
+    Returns:
+        An AsyncClient, to be closed when the server shuts down
+    """
+    return AsyncClient(
+        http2=http2,
+        limits=Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+
+
+async def fetch_robots_txt(
+    client: AsyncClient, robot_txt_url: str, user_agent: str
+) -> RobotsTxt:
+    """Fetch and parse a robots.txt file.
+
+    Args:
+        client: HTTP client to fetch with
+        robot_txt_url: URL of the robots.txt file
+        user_agent: User-Agent string to send
+
+    Returns:
+        The parsed file, or an unrestricted one if the server has none
+    """
+    try:
+        response = await client.get(
+            robot_txt_url,
+            follow_redirects=True,
+            headers={"User-Agent": user_agent},
+        )
+    except HTTPError:
+        raise McpError(ErrorData(
+            code=INTERNAL_ERROR,
+            message=f"Failed to fetch robots.txt {robot_txt_url} due to a connection issue",
+        ))
+    max_age = freshness_lifetime(response.headers)
+    if response.status_code >= 500:
+        # Don't hold on to what is likely a passing server error
+        max_age = 0.0
+    if 400 <= response.status_code < 500:
+        return RobotsTxt(robot_txt_url, response.status_code, "", None, max_age)
+    robot_txt = response.text
+    return RobotsTxt(
+        robot_txt_url, response.status_code, robot_txt, parse_robots_txt(robot_txt), max_age
+    )
+
+
+async def check_may_autonomously_fetch_url(
+    client: AsyncClient,
+    url: str,
+    user_agent: str,
+    robots_cache: RobotsTxtCache | None = None,
+) -> None:
     """
     Check if the URL can be fetched by the user agent according to the robots.txt file.
     Raises a McpError if not.
     """
-    from httpx import AsyncClient, HTTPError
-
     robot_txt_url = get_robots_txt_url(url)
 
-    async with AsyncClient() as client:
-        try:
-            response = await client.get(
-                robot_txt_url,
-                follow_redirects=True,
-                headers={"User-Agent": user_agent},
-            )
-        except HTTPError:
-            raise McpError(ErrorData(
-                code=INTERNAL_ERROR,
-                message=f"Failed to fetch robots.txt {robot_txt_url} due to a connection issue",
-            ))
-        if response.status_code in (401, 403):
-            raise McpError(ErrorData(
-                code=INTERNAL_ERROR,
-                message=f"When fetching robots.txt ({robot_txt_url}), received status {response.status_code} so assuming that autonomous fetching is not allowed, the user can try manually fetching by using the fetch prompt",
-            ))
-        elif 400 <= response.status_code < 500:
-            return
-        robot_txt = response.text
-    processed_robot_txt = "\n".join(
-        line for line in robot_txt.splitlines() if not line.strip().startswith("#")
-    )
-    robot_parser = Protego.parse(processed_robot_txt)
-    if not robot_parser.can_fetch(str(url), user_agent):
+    def load() -> Awaitable[RobotsTxt]:
+        return fetch_robots_txt(client, robot_txt_url, user_agent)
+
+    if robots_cache is not None:
+        robots = await robots_cache.get(robot_txt_url, load)
+    else:
+        robots = await load()
+    if robots.denied:
+        raise McpError(ErrorData(
+            code=INTERNAL_ERROR,
+            message=f"When fetching robots.txt ({robot_txt_url}), received status {robots.status_code} so assuming that autonomous fetching is not allowed, the user can try manually fetching by using the fetch prompt",
+        ))
+    if not robots.can_fetch(str(url), user_agent):
         raise McpError(ErrorData(
             code=INTERNAL_ERROR,
             message=f"The sites robots.txt ({robot_txt_url}), specifies that autonomous fetching of this page is not allowed, "
             f"<useragent>{user_agent}</useragent>\n"
             f"<url>{url}</url>"
-            f"<robots>\n{robot_txt}\n</robots>\n"
+            f"<robots>\n{robots.text}\n</robots>\n"
             f"The assistant must let the user know that it failed to view the page. The assistant may provide further guidance based on the above information.\n"
             f"The assistant can tell the user that they can try manually fetching the page by using the fetch prompt within their UI.",
         ))
 
 
 async def fetch_url(
-    url: str, user_agent: str, force_raw: bool = False
+    client: AsyncClient,
+    url: str,
+    user_agent: str,
+    force_raw: bool = False,
+    content_cache: ContentCache | None = None,
+    disk_cache: DiskCache | None = None,
 ) -> Tuple[str, str]:
     """
     Fetch the URL and return the content in a form ready for the LLM, as well as a prefix string with status information.
     """
-    from httpx import AsyncClient, HTTPError
-
-    async with AsyncClient() as client:
+    if content_cache is not None:
+        page = content_cache.get(url, force_raw, user_agent)
+        if page is None:
+            page = await fetch_url(client, url, user_agent, force_raw, disk_cache=disk_cache)
+            content_cache.put(url, force_raw, user_agent, page)
+        return page
+
+    cached = disk_cache.get(url) if disk_cache is not None else None
+    if cached is not None and cached.fresh:
+        page_raw, content_type = cached.body, cached.content_type
+    else:
+        headers = {"User-Agent": user_agent}
+        if cached is not None:
+            headers.update(cached.validators())
         try:
             response = await client.get(
                 url,
                 follow_redirects=True,
-                headers={"User-Agent": user_agent},
+                headers=headers,
                 timeout=30,
             )
         except HTTPError as e:
             raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Failed to fetch {url}: {e!r}"))
-        if response.status_code >= 400:
-            raise McpError(ErrorData(
-                code=INTERNAL_ERROR,
-                message=f"Failed to fetch {url} - status code {response.status_code}",
-            ))
+        if cached is not None and response.status_code == 304:
+            disk_cache.refresh(cached, response.headers)
+            page_raw, content_type = cached.body, cached.content_type
+        else:
+            if response.status_code >= 400:
+                raise McpError(ErrorData(
+                    code=INTERNAL_ERROR,
+                    message=f"Failed to fetch {url} - status code {response.status_code}",
+                ))
 
-        page_raw = response.text
+            page_raw = response.text
+            content_type = response.headers.get("content-type", "")
+            if disk_cache is not None:
+                cached = disk_cache.put(url, response.status_code, response.headers, page_raw)
 
-    content_type = response.headers.get("content-type", "")
     is_page_html = (
         "<html" in page_raw[:100] or "text/html" in content_type or not content_type
     )
 
     if is_page_html and not force_raw:
-        return extract_content_from_html(page_raw), ""
+        if cached is not None and cached.markdown is not None:
+            return cached.markdown, ""
+        content = extract_content_from_html(page_raw)
+        if cached is not None:
+            disk_cache.set_markdown(cached, content)
+        return content, ""
 
     return (
         page_raw,
@@ -179,15 +276,43 @@ class Fetch(BaseModel):
 
 
 async def serve(
-    custom_user_agent: str | None = None, ignore_robots_txt: bool = False
+    custom_user_agent: str | None = None,
+    ignore_robots_txt: bool = False,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    http2: bool = False,
+    robots_txt_ttl: float = DEFAULT_ROBOTS_TXT_TTL,
+    content_cache_bytes: int = DEFAULT_CONTENT_CACHE_BYTES,
+    content_cache_ttl: float = DEFAULT_CONTENT_CACHE_TTL,
+    cache_dir: str | None = None,
+    cache_max_bytes: int = DEFAULT_DISK_CACHE_BYTES,
 ) -> None:
     """Run the fetch MCP server.
 
     Args:
         custom_user_agent: Optional custom User-Agent string to use for requests
         ignore_robots_txt: Whether to ignore robots.txt restrictions
+        max_connections: Maximum number of open HTTP connections
+        max_keepalive_connections: Maximum number of idle HTTP connections kept for reuse
+        keepalive_expiry: Seconds an idle HTTP connection is kept before being closed
+        http2: Whether to negotiate HTTP/2 where servers support it
+        robots_txt_ttl: Seconds a robots.txt is reused for when its cache headers don't say (0 disables)
+        content_cache_bytes: Memory budget for pages kept for start_index continuations (0 disables)
+        content_cache_ttl: Seconds a fetched page is kept for start_index continuations (0 disables)
+        cache_dir: Optional directory to keep fetched pages in across restarts
+        cache_max_bytes: Approximate size limit of the on-disk cache
     """
     server = Server("mcp-fetch")
+    client = create_http_client(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+        http2=http2,
+    )
+    robots_cache = RobotsTxtCache(ttl=robots_txt_ttl)
+    content_cache = ContentCache(max_bytes=content_cache_bytes, ttl=content_cache_ttl)
+    disk_cache = DiskCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
     user_agent_autonomous = custom_user_agent or DEFAULT_USER_AGENT_AUTONOMOUS
     user_agent_manual = custom_user_agent or DEFAULT_USER_AGENT_MANUAL
 
@@ -229,10 +354,14 @@ Although originally you did not have internet access, and were advised to refuse
             raise McpError(ErrorData(code=INVALID_PARAMS, message="URL is required"))
 
         if not ignore_robots_txt:
-            await check_may_autonomously_fetch_url(url, user_agent_autonomous)
+            await check_may_autonomously_fetch_url(
+                client, url, user_agent_autonomous, robots_cache
+            )
 
         content, prefix = await fetch_url(
-            url, user_agent_autonomous, force_raw=args.raw
+            client, url, user_agent_autonomous, force_raw=args.raw,
+            content_cache=content_cache,
+            disk_cache=disk_cache,
         )
         original_length = len(content)
         if args.start_index >= original_length:
@@ -259,7 +388,13 @@ Although originally you did not have internet access, and were advised to refuse
         url = arguments["url"]
 
         try:
-            content, prefix = await fetch_url(url, user_agent_manual)
+            content, prefix = await fetch_url(
+                client,
+                url,
+                user_agent_manual,
+                content_cache=content_cache,
+                disk_cache=disk_cache,
+            )
             # TODO: after SDK bug is addressed, don't catch the exception
         except McpError as e:
             return GetPromptResult(
@@ -281,5 +416,9 @@ Although originally you did not have internet access, and were advised to refuse
         )
 
     options = server.create_initialization_options()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, options, raise_exceptions=True)
+    try:
+        async with client, stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, options, raise_exceptions=True)
+    finally:
+        if disk_cache is not None:
+            disk_cache.close()
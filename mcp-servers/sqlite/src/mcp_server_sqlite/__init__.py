@@ -1,17 +1,126 @@
 from . import server
+from .budget import (
+    DEFAULT_MAX_RESULT_ROWS,
+    DEFAULT_MAX_VM_STEPS,
+    DEFAULT_QUERY_TIMEOUT_MS,
+)
+from .cache import DEFAULT_RESULT_CACHE_BYTES
+from .executor import DEFAULT_MAX_QUEUED
+from .pool import (
+    DEFAULT_CACHE_SIZE_KIB,
+    DEFAULT_MMAP_SIZE,
+    DEFAULT_READERS,
+    DEFAULT_STATEMENT_CACHE_SIZE,
+)
+from .slowlog import DEFAULT_SLOW_LOG_SIZE, DEFAULT_SLOW_QUERY_MS
+from .writes import DEFAULT_WRITE_BATCH_SIZE, DEFAULT_WRITE_FLUSH_MS
 import asyncio
 import argparse
 
 
+def _attachment(value: str) -> tuple[str, str]:
+    name, sep, path = value.partition('=')
+    if not sep or not name or not path:
+        raise argparse.ArgumentTypeError('expected NAME=PATH')
+    return name, path
+
+
 def main():
     """Main entry point for the package."""
     parser = argparse.ArgumentParser(description='SQLite MCP Server')
     parser.add_argument('--db-path', 
                        default="./sqlite_mcp_server.db",
                        help='Path to SQLite database file')
+    parser.add_argument('--data-dir',
+                       default=None,
+                       help='Directory for export_query files (default: exports/ beside the database)')
+    parser.add_argument('--snapshot-dir',
+                       default=None,
+                       help='Directory for snapshot files (default: snapshots/ beside the database)')
+    parser.add_argument('--attach',
+                       type=_attachment,
+                       action='append',
+                       default=[],
+                       metavar='NAME=PATH',
+                       help='Attach another database file under a schema name (repeatable)')
+    parser.add_argument('--readers',
+                       type=int,
+                       default=DEFAULT_READERS,
+                       help='Number of pooled reader connections')
+    parser.add_argument('--cache-size-kib',
+                       type=int,
+                       default=DEFAULT_CACHE_SIZE_KIB,
+                       help='SQLite page cache size per connection in KiB')
+    parser.add_argument('--mmap-size',
+                       type=int,
+                       default=DEFAULT_MMAP_SIZE,
+                       help='Bytes of the database memory-mapped by each reader (0 disables)')
+    parser.add_argument('--max-concurrency',
+                       type=int,
+                       default=None,
+                       help='Maximum concurrent database calls (default: readers + 1)')
+    parser.add_argument('--max-queued',
+                       type=int,
+                       default=DEFAULT_MAX_QUEUED,
+                       help='Maximum database calls queued behind the running ones')
+    parser.add_argument('--statement-cache-size',
+                       type=int,
+                       default=DEFAULT_STATEMENT_CACHE_SIZE,
+                       help='Prepared statements cached per connection')
+    parser.add_argument('--result-cache-bytes',
+                       type=int,
+                       default=DEFAULT_RESULT_CACHE_BYTES,
+                       help='Memory budget for cached read_query results (0 disables)')
+    parser.add_argument('--slow-query-ms',
+                       type=float,
+                       default=DEFAULT_SLOW_QUERY_MS,
+                       help='Log statements slower than this many milliseconds (negative disables)')
+    parser.add_argument('--slow-log-size',
+                       type=int,
+                       default=DEFAULT_SLOW_LOG_SIZE,
+                       help='Number of slow statements kept in the slow-query log')
+    parser.add_argument('--query-timeout-ms',
+                       type=float,
+                       default=DEFAULT_QUERY_TIMEOUT_MS,
+                       help='Stop any single query after this many milliseconds (0 disables)')
+    parser.add_argument('--max-vm-steps',
+                       type=int,
+                       default=DEFAULT_MAX_VM_STEPS,
+                       help='Stop any single query after this many SQLite VM steps (0 disables)')
+    parser.add_argument('--max-result-rows',
+                       type=int,
+                       default=DEFAULT_MAX_RESULT_ROWS,
+                       help='Truncate read_query results after this many rows (0 disables)')
+    parser.add_argument('--write-batch-size',
+                       type=int,
+                       default=DEFAULT_WRITE_BATCH_SIZE,
+                       help='Maximum write_query calls group-committed in one transaction (1 disables)')
+    parser.add_argument('--write-flush-ms',
+                       type=float,
+                       default=DEFAULT_WRITE_FLUSH_MS,
+                       help='Longest a write_query waits for others to share its commit')
     
     args = parser.parse_args()
-    asyncio.run(server.main(args.db_path))
+    asyncio.run(server.main(
+        args.db_path,
+        readers=args.readers,
+        cache_size_kib=args.cache_size_kib,
+        max_concurrency=args.max_concurrency,
+        max_queued=args.max_queued,
+        statement_cache_size=args.statement_cache_size,
+        result_cache_bytes=args.result_cache_bytes,
+        slow_query_ms=args.slow_query_ms,
+        slow_log_size=args.slow_log_size,
+        mmap_size=args.mmap_size,
+        query_timeout_ms=args.query_timeout_ms,
+        max_vm_steps=args.max_vm_steps,
+        max_result_rows=args.max_result_rows,
+        data_dir=args.data_dir,
+        attach=dict(args.attach),
+        write_batch_size=args.write_batch_size,
+        write_flush_ms=args.write_flush_ms,
+        snapshot_dir=args.snapshot_dir,
+    ))
 
 
 # Optionally expose other important items at package level
@@ -0,0 +1,399 @@
+"""Reproducible workload benchmarks for the SQLite MCP server.
+
+Each workload drives the real tool handlers through an in-memory MCP client
+session (no stdio, no subprocess) against a generated database, and reports
+throughput and latency percentiles as JSON so runs can be compared release
+to release:
+
+    python -m mcp_server_sqlite.bench --rows 100000 --ops 1000 > before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import anyio
+from mcp.client.session import ClientSession
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from .metrics import LatencyHistogram
+from .server import SqliteDatabase, create_server
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_ROWS = 10000
+DEFAULT_OPS = 500
+DEFAULT_SEED = 0
+BULK_BATCH_ROWS = 1000
+PAGES_PER_WALK = 5
+
+REGIONS = ["north", "south", "east", "west", "central"]
+CATEGORIES = ["hardware", "software", "services", "support", "training", "licenses"]
+
+# Calls a tool and returns its text contents, or an empty list if it failed
+Call = Callable[[str, dict[str, Any]], Awaitable[list[str]]]
+
+
+def generate_database(path: Path, rows: int, seed: int = DEFAULT_SEED) -> dict[str, int]:
+    """Create a sales database with ``rows`` orders; the same seed gives the same data"""
+    rng = random.Random(seed)
+    customers = max(rows // 10, 1)
+    products = max(rows // 100, 1)
+    with sqlite3.connect(path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE customers (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                region TEXT NOT NULL,
+                signup_date TEXT NOT NULL
+            );
+            CREATE TABLE products (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                category TEXT NOT NULL,
+                price REAL NOT NULL
+            );
+            CREATE TABLE orders (
+                id INTEGER PRIMARY KEY,
+                customer_id INTEGER NOT NULL REFERENCES customers(id),
+                product_id INTEGER NOT NULL REFERENCES products(id),
+                quantity INTEGER NOT NULL,
+                amount REAL NOT NULL,
+                order_date TEXT NOT NULL
+            );
+            CREATE INDEX idx_orders_customer ON orders (customer_id);
+            """
+        )
+        conn.executemany(
+            "INSERT INTO customers VALUES (?, ?, ?, ?)",
+            (
+                (i, f"customer-{i}", rng.choice(REGIONS), _date(rng))
+                for i in range(1, customers + 1)
+            ),
+        )
+        prices = [round(rng.uniform(5, 500), 2) for _ in range(products)]
+        conn.executemany(
+            "INSERT INTO products VALUES (?, ?, ?, ?)",
+            (
+                (i, f"product-{i}", rng.choice(CATEGORIES), prices[i - 1])
+                for i in range(1, products + 1)
+            ),
+        )
+
+        def orders():
+            for i in range(1, rows + 1):
+                product = rng.randint(1, products)
+                quantity = rng.randint(1, 10)
+                yield (
+                    i,
+                    rng.randint(1, customers),
+                    product,
+                    quantity,
+                    round(prices[product - 1] * quantity, 2),
+                    _date(rng),
+                )
+
+        conn.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)", orders())
+    conn.close()
+    return {"customers": customers, "products": products, "orders": rows}
+
+
+def _date(rng: random.Random) -> str:
+    return f"202{rng.randint(0, 4)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+@dataclass
+class WorkloadResult:
+    name: str
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ops: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Throughput per workload op and per tool call; latency is per tool call"""
+        calls = self.latency.count
+        per_second = (lambda n: round(n / self.seconds, 2)) if self.seconds > 0 else (lambda n: None)
+        return {
+            "ops": self.ops,
+            "calls": calls,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 6),
+            "ops_per_second": per_second(self.ops),
+            "calls_per_second": per_second(calls),
+            "latency": self.latency.summary(),
+        }
+
+
+# A workload issues one tool call per op index; it is given a seeded RNG and
+# the size of the generated tables.
+Workload = Callable[[Call, random.Random, dict[str, int], int], Awaitable[None]]
+
+
+async def point_reads(call: Call, rng: random.Random, sizes: dict[str, int], op: int) -> None:
+    await call("read_query", {
+        "query": "SELECT * FROM orders WHERE id = ?",
+        "params": [rng.randint(1, sizes["orders"])],
+    })
+
+
+async def mixed(call: Call, rng: random.Random, sizes: dict[str, int], op: int) -> None:
+    """80% reads, 20% writes, so reads also see the result cache being invalidated"""
+    roll = rng.random()
+    if roll < 0.5:
+        await call("read_query", {
+            "query": "SELECT o.id, o.amount, c.region FROM orders o JOIN customers c ON c.id = o.customer_id WHERE o.customer_id = ?",
+            "params": [rng.randint(1, sizes["customers"])],
+        })
+    elif roll < 0.8:
+        await call("read_query", {
+            "query": "SELECT region, COUNT(*), SUM(o.amount) FROM orders o JOIN customers c ON c.id = o.customer_id WHERE c.region = ? GROUP BY region",
+            "params": [rng.choice(REGIONS)],
+        })
+    elif roll < 0.95:
+        await call("write_query", {
+            "query": "UPDATE orders SET quantity = quantity + 1 WHERE id = ?",
+            "params": [rng.randint(1, sizes["orders"])],
+        })
+    else:
+        await call("write_query", {
+            "query": "INSERT INTO customers (name, region, signup_date) VALUES (?, ?, ?)",
+            "params": [f"new-customer-{op}", rng.choice(REGIONS), _date(rng)],
+        })
+
+
+async def large_scans(call: Call, rng: random.Random, sizes: dict[str, int], op: int) -> None:
+    """Full-table aggregates, a columnar bulk read and a paginated walk"""
+    kind = op % 3
+    if kind == 0:
+        await call("read_query", {
+            "query": "SELECT p.category, COUNT(*), SUM(o.amount), AVG(o.quantity) FROM orders o JOIN products p ON p.id = o.product_id WHERE o.amount > ? GROUP BY p.category",
+            "params": [rng.uniform(0, 100)],
+        })
+    elif kind == 1:
+        await call("read_query", {
+            "query": "SELECT id, customer_id, amount, order_date FROM orders WHERE order_date >= ? LIMIT 5000",
+            "params": [_date(rng)],
+            "format": "columnar",
+        })
+    else:
+        contents = await call("read_query", {
+            "query": "SELECT * FROM orders WHERE amount > ?",
+            "params": [rng.uniform(0, 1000)],
+            "page_size": 1000,
+            "format": "ndjson",
+        })
+        for _ in range(PAGES_PER_WALK - 1):
+            next_cursor = json.loads(contents[-1])["next_cursor"] if contents else None
+            if not next_cursor:
+                break
+            contents = await call("read_query", {
+                "cursor": next_cursor, "page_size": 1000, "format": "ndjson",
+            })
+
+
+async def schema_exploration(call: Call, rng: random.Random, sizes: dict[str, int], op: int) -> None:
+    kind = op % 3
+    if kind == 0:
+        await call("list_tables", {})
+    elif kind == 1:
+        await call("describe_table", {"table_name": rng.choice(["customers", "products", "orders"])})
+    else:
+        await call("describe_schema", {})
+
+
+async def bulk_load(call: Call, rng: random.Random, sizes: dict[str, int], op: int) -> None:
+    rows = [
+        [rng.randint(1, sizes["customers"]), rng.randint(1, sizes["products"]),
+         rng.randint(1, 10), round(rng.uniform(5, 5000), 2), _date(rng)]
+        for _ in range(BULK_BATCH_ROWS)
+    ]
+    await call("insert_rows", {
+        "table": "orders",
+        "columns": ["customer_id", "product_id", "quantity", "amount", "order_date"],
+        "rows": rows,
+    })
+
+
+WORKLOADS: dict[str, Workload] = {
+    "point_reads": point_reads,
+    "mixed": mixed,
+    "large_scans": large_scans,
+    "schema_exploration": schema_exploration,
+    "bulk_load": bulk_load,
+}
+
+
+async def _run_workload(
+    session: ClientSession,
+    name: str,
+    sizes: dict[str, int],
+    ops: int,
+    concurrency: int,
+    seed: int,
+) -> WorkloadResult:
+    result = WorkloadResult(name)
+    workload = WORKLOADS[name]
+    rng = random.Random(f"{seed}:{name}")
+
+    async def call(tool: str, arguments: dict[str, Any]) -> list[str]:
+        started = time.perf_counter()
+        response = await session.call_tool(tool, arguments)
+        result.latency.record(time.perf_counter() - started)
+        contents = [c.text for c in response.content if c.type == "text"]
+        if response.isError or (contents and contents[0].startswith(("Error:", "Database error:"))):
+            result.errors += 1
+            logger.warning(f"Benchmark {name}: {tool} failed: {contents[:1]}")
+            return []
+        return contents
+
+    next_op = 0
+
+    async def client() -> None:
+        nonlocal next_op
+        while next_op < ops:
+            op = next_op
+            next_op += 1
+            await workload(call, rng, sizes, op)
+            result.ops += 1
+
+    started = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(concurrency):
+            tg.start_soon(client)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+async def run_benchmarks(
+    workloads: list[str],
+    rows: int = DEFAULT_ROWS,
+    ops: int = DEFAULT_OPS,
+    concurrency: int = 1,
+    seed: int = DEFAULT_SEED,
+    work_dir: str | None = None,
+    **db_options: Any,
+) -> dict[str, Any]:
+    """Generate a database, run each workload against a fresh server and collect the results"""
+    unknown = [name for name in workloads if name not in WORKLOADS]
+    if unknown:
+        raise ValueError(f"Unknown workloads: {', '.join(unknown)}. Expected: {', '.join(WORKLOADS)}")
+
+    report: dict[str, Any] = {
+        "benchmark": "mcp-server-sqlite",
+        "version": _package_version(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "config": {
+            "rows": rows,
+            "ops": ops,
+            "concurrency": concurrency,
+            "seed": seed,
+            **db_options,
+        },
+        "workloads": {},
+    }
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        for name in workloads:
+            # Each workload gets its own copy of the data so earlier writes cannot skew it
+            db_path = Path(tmp) / f"{name}.db"
+            generated = time.perf_counter()
+            sizes = generate_database(db_path, rows, seed)
+            logger.info(f"Generated {db_path} in {time.perf_counter() - generated:.2f}s")
+
+            db = SqliteDatabase(str(db_path), data_dir=str(Path(tmp) / "exports"), **db_options)
+            try:
+                async with create_connected_server_and_client_session(create_server(db)) as session:
+                    result = await _run_workload(session, name, sizes, ops, concurrency, seed)
+                entry = result.to_dict()
+                stats = db.stats()
+                entry["sqlite"] = stats["sqlite"]
+                entry["serialization"] = stats["serialization"]
+                entry["caches"] = stats["caches"]
+                report["workloads"][name] = entry
+            finally:
+                db.close()
+    return report
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("mcp-server-sqlite")
+    except Exception:
+        return "unknown"
+
+
+def main() -> None:
+    """Command-line entry point: print the benchmark report as JSON"""
+    parser = argparse.ArgumentParser(description='SQLite MCP Server benchmarks')
+    parser.add_argument('--workloads',
+                       default=",".join(WORKLOADS),
+                       help=f'Comma-separated workloads to run (default: all of {", ".join(WORKLOADS)})')
+    parser.add_argument('--rows',
+                       type=int,
+                       default=DEFAULT_ROWS,
+                       help='Orders in each generated database')
+    parser.add_argument('--ops',
+                       type=int,
+                       default=DEFAULT_OPS,
+                       help='Tool calls per workload')
+    parser.add_argument('--concurrency',
+                       type=int,
+                       default=1,
+                       help='Client tasks issuing calls at once; the server handles them concurrently')
+    parser.add_argument('--seed',
+                       type=int,
+                       default=DEFAULT_SEED,
+                       help='Seed for the generated data and the operation mix')
+    parser.add_argument('--readers',
+                       type=int,
+                       default=None,
+                       help='Pooled reader connections (default: server default)')
+    parser.add_argument('--result-cache-bytes',
+                       type=int,
+                       default=None,
+                       help='Result cache budget (default: server default, 0 disables)')
+    parser.add_argument('--work-dir',
+                       default=None,
+                       help='Directory for the generated databases (default: system temp)')
+    parser.add_argument('--output',
+                       default=None,
+                       help='Write the JSON report to this file instead of stdout')
+
+    args = parser.parse_args()
+    db_options = {
+        key: value
+        for key, value in (("readers", args.readers), ("result_cache_bytes", args.result_cache_bytes))
+        if value is not None
+    }
+    report = asyncio.run(run_benchmarks(
+        [name.strip() for name in args.workloads.split(",") if name.strip()],
+        rows=args.rows,
+        ops=args.ops,
+        concurrency=args.concurrency,
+        seed=args.seed,
+        work_dir=args.work_dir,
+        **db_options,
+    ))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Iterator
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_QUERY_TIMEOUT_MS = 30000.0
+DEFAULT_MAX_VM_STEPS = 0
+DEFAULT_MAX_RESULT_ROWS = 10000
+
+# The progress handler runs once per this many SQLite VM instructions
+PROGRESS_INTERVAL = 1000
+
+# Rows fetched per batch, so a statement stopped mid-result keeps what it read
+FETCH_BATCH_SIZE = 256
+
+_REASONS = {
+    "timeout": "exceeded its time budget of {timeout_ms:g} ms",
+    "max_steps": "exceeded its budget of {max_steps} VM steps",
+    "max_rows": "reached its budget of {max_rows} rows",
+    "cancelled": "was cancelled",
+}
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Limits on one call's wall time, SQLite VM steps and result rows (0 = unlimited)"""
+
+    timeout_ms: float = DEFAULT_QUERY_TIMEOUT_MS
+    max_steps: int = DEFAULT_MAX_VM_STEPS
+    max_rows: int = DEFAULT_MAX_RESULT_ROWS
+
+    def limit(self, timeout_ms: float | None = None, max_rows: int | None = None) -> "QueryBudget":
+        """Apply per-call limits, which may tighten but never relax the server's"""
+        budget = self
+        if timeout_ms is not None:
+            if timeout_ms <= 0:
+                raise ValueError("timeout_ms must be positive")
+            budget = replace(budget, timeout_ms=_tightest(budget.timeout_ms, timeout_ms))
+        if max_rows is not None:
+            if max_rows < 1:
+                raise ValueError("max_rows must be at least 1")
+            budget = replace(budget, max_rows=int(_tightest(budget.max_rows, max_rows)))
+        return budget
+
+
+def _tightest(current: float, requested: float) -> float:
+    return requested if current <= 0 else min(current, requested)
+
+
+class QueryGuard:
+    """Enforces a QueryBudget on the statements of one call.
+
+    While a connection is watched, SQLite's progress handler checks the
+    deadline, the VM step count and cancellation every PROGRESS_INTERVAL
+    instructions and aborts the statement when any is exceeded; cancel()
+    additionally interrupts the connection from another thread. The clock
+    starts when the first statement runs, not while the call is queued.
+    """
+
+    def __init__(self, budget: QueryBudget):
+        self.budget = budget
+        self.reason: str | None = None
+        self.steps = 0
+        self._started: float | None = None
+        self._deadline: float | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def watch(self, conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+        """Enforce the budget on a connection for the duration of the block"""
+        with self._lock:
+            if self.reason == "cancelled":
+                raise sqlite3.OperationalError("interrupted")
+            if self._started is None:
+                self._started = time.monotonic()
+                if self.budget.timeout_ms > 0:
+                    self._deadline = self._started + self.budget.timeout_ms / 1000
+            self._conn = conn
+        conn.set_progress_handler(self._progress, PROGRESS_INTERVAL)
+        try:
+            yield conn
+        finally:
+            conn.set_progress_handler(None, PROGRESS_INTERVAL)
+            with self._lock:
+                self._conn = None
+
+    def _progress(self) -> int:
+        self.steps += PROGRESS_INTERVAL
+        if self.reason is not None:
+            return 1
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.reason = "timeout"
+        elif self.budget.max_steps > 0 and self.steps >= self.budget.max_steps:
+            self.reason = "max_steps"
+        return 1 if self.reason is not None else 0
+
+    def check(self) -> bool:
+        """Whether the call should stop, for work done in Python between fetches"""
+        if self.reason is None and self._deadline is not None and time.monotonic() >= self._deadline:
+            self.reason = "timeout"
+        return self.reason is not None
+
+    def cancel(self) -> None:
+        """Abort the running statement, if any, and refuse to start new ones"""
+        with self._lock:
+            self.reason = "cancelled"
+            if self._conn is not None:
+                self._conn.interrupt()
+        logger.debug("Cancelled running query")
+
+    def interrupted(self, error: BaseException) -> bool:
+        """Whether an exception is this guard having stopped the statement"""
+        return (
+            self.reason is not None
+            and isinstance(error, sqlite3.OperationalError)
+            and "interrupt" in str(error)
+        )
+
+    def fetch(self, cursor: sqlite3.Cursor, limit: int = 0) -> list[Any]:
+        """Fetch up to limit rows (0 = all), keeping what was read if the guard stops the statement"""
+        rows: list[Any] = []
+        try:
+            while limit <= 0 or len(rows) < limit:
+                size = FETCH_BATCH_SIZE if limit <= 0 else min(FETCH_BATCH_SIZE, limit - len(rows))
+                batch = cursor.fetchmany(size)
+                rows.extend(batch)
+                if len(batch) < size:
+                    break
+        except sqlite3.OperationalError as e:
+            if not self.interrupted(e):
+                raise
+        return rows
+
+    def fetch_result(self, cursor: sqlite3.Cursor) -> list[Any]:
+        """Fetch a whole result, truncated at the row budget"""
+        limit = self.budget.max_rows
+        rows = self.fetch(cursor, limit)
+        if self.reason is None and 0 < limit <= len(rows):
+            # Only call the result truncated if there really is another row
+            if self.fetch(cursor, 1):
+                self.reason = "max_rows"
+        return rows
+
+    @property
+    def elapsed_ms(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (time.monotonic() - self._started) * 1000
+
+    def describe(self) -> str:
+        """Human-readable reason the call was stopped"""
+        if self.reason is None:
+            return "Query completed within its budget"
+        detail = _REASONS[self.reason].format(**vars(self.budget))
+        return f"Query {detail} and was stopped after {self.elapsed_ms:.0f} ms"
+
+    def status(self, rows: int) -> dict[str, Any]:
+        """Truncation notice returned alongside a partial result"""
+        return {
+            "truncated": True,
+            "reason": self.reason,
+            "rows_returned": rows,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "message": f"{self.describe()}; the result is incomplete",
+        }
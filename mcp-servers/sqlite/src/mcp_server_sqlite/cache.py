@@ -0,0 +1,148 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_RESULT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Rough per-object overheads used to estimate the memory held by a result
+_ROW_OVERHEAD = 56
+_VALUE_OVERHEAD = 16
+
+# Results of these can change without the database changing
+_VOLATILE = re.compile(
+    r"\b(random|randomblob|changes|total_changes|last_insert_rowid)\s*\("
+    r"|'now'|\bcurrent_(date|time|timestamp)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace outside of quoted literals and identifiers"""
+    out: list[str] = []
+    quote: str | None = None
+    pending_space = False
+    for ch in query.strip():
+        if quote:
+            out.append(ch)
+            if ch == quote:
+                quote = None
+            continue
+        if ch.isspace():
+            pending_space = True
+            continue
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        out.append(ch)
+        if ch in "'\"`":
+            quote = ch
+        elif ch == "[":
+            quote = "]"
+    return "".join(out)
+
+
+def is_cacheable(query: str) -> bool:
+    """Whether a read's result depends only on the database contents"""
+    return _VOLATILE.search(query) is None
+
+
+def params_key(params: Any) -> Hashable:
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return tuple(sorted((k, repr(v)) for k, v in params.items()))
+    return tuple(repr(v) for v in params)
+
+
+def estimate_size(rows: list[tuple]) -> int:
+    size = 0
+    for row in rows:
+        size += _ROW_OVERHEAD
+        for value in row:
+            size += _VALUE_OVERHEAD
+            if isinstance(value, (str, bytes)):
+                size += len(value)
+            else:
+                size += 8
+    return size
+
+
+class ResultCache:
+    """LRU cache of read results bounded by an estimated byte budget.
+
+    Entries belong to a database version (see ConnectionPool.data_version);
+    the whole cache is dropped as soon as a lookup observes a different
+    version, so a result is never served after the data it was read from
+    has changed.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[list[str], list[tuple], int]] = OrderedDict()
+        self._version: Hashable = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable, version: Hashable) -> tuple[list[str], list[tuple]] | None:
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: Hashable, version: Hashable, columns: list[str], rows: list[tuple]) -> None:
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                # The data changed while the query ran; this result may be stale
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (columns, rows, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+
+    def invalidate(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._clear()
+            self._version = None
+
+    def _clear(self) -> None:
+        if self._entries:
+            logger.debug(f"Invalidating {len(self._entries)} cached results")
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
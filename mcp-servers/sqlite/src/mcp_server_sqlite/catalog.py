@@ -0,0 +1,238 @@
+import logging
+import sqlite3
+import string
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from .pool import ConnectionPool
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+# Tables the server creates for its own bookkeeping; hidden from the schema tools
+INTERNAL_TABLE_PREFIX = "_mcp_"
+
+# Column names of PRAGMA table_info, which describe_table has always returned
+TABLE_INFO_COLUMNS = ["cid", "name", "type", "notnull", "dflt_value", "pk"]
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for safe interpolation into SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def fold_identifier(name: str) -> str:
+    """Key for comparing identifiers as SQLite does: only ASCII letters ignore case"""
+    return name.translate(_ASCII_LOWER)
+
+
+def quote_table(schema: str, table: str) -> str:
+    """Quote a table name, qualified by its database unless it lives in main"""
+    if schema == "main":
+        return quote_identifier(table)
+    return f"{quote_identifier(schema)}.{quote_identifier(table)}"
+
+
+@dataclass
+class TableSchema:
+    """One table or view; those of attached databases are named 'schema.table'"""
+
+    name: str
+    schema: str = "main"
+    # 'table' or 'view', as in sqlite_master
+    kind: str = "table"
+    columns: list[tuple] = field(default_factory=list)
+    indexes: list[dict[str, Any]] = field(default_factory=list)
+    foreign_keys: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def table_name(self) -> str:
+        """Name of the table within its own database"""
+        if self.schema == "main":
+            return self.name
+        return self.name[len(self.schema) + 1:]
+
+    @property
+    def sql_name(self) -> str:
+        return quote_table(self.schema, self.table_name)
+
+    @property
+    def is_view(self) -> bool:
+        return self.kind == "view"
+
+    @property
+    def column_names(self) -> list[str]:
+        return [col[1] for col in self.columns]
+
+    def resolve_columns(self, columns: list[str]) -> list[str]:
+        """Canonical names of the given columns, matched case-insensitively as SQLite does"""
+        by_folded_name = {fold_identifier(name): name for name in self.column_names}
+        unknown = [col for col in columns if fold_identifier(col) not in by_folded_name]
+        if unknown:
+            raise ValueError(f"Unknown columns for table {self.name}: {', '.join(unknown)}")
+        return [by_folded_name[fold_identifier(col)] for col in columns]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "schema": self.schema,
+            "type": self.kind,
+            "columns": [
+                {
+                    "name": name,
+                    "type": type_,
+                    "notnull": bool(notnull),
+                    "default": default,
+                    "pk": pk,
+                }
+                for _, name, type_, notnull, default, pk in self.columns
+            ],
+            "indexes": self.indexes,
+            "foreign_keys": self.foreign_keys,
+        }
+
+
+class SchemaCatalog:
+    """In-memory copy of the database schema.
+
+    The catalog is loaded in one pass on first use and reused until
+    PRAGMA schema_version changes, so listing and describing tables does not
+    touch sqlite_master or run per-table PRAGMAs on every call. Views are
+    kept too, so they can be described, but are not listed as tables.
+    Tables of attached databases are listed as 'schema.table'; 'main.table'
+    is accepted as another name for a table of the main database. Names are
+    looked up case-insensitively, as SQLite resolves them, and the table
+    comes back under its canonical name.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._version: tuple[int, ...] | None = None
+        self._tables: dict[str, TableSchema] = {}
+        # Folded name -> the table under its canonical name
+        self._by_folded_name: dict[str, TableSchema] = {}
+
+    def _current(self) -> tuple[dict[str, TableSchema], dict[str, TableSchema]]:
+        version = self.pool.schema_version()
+        with self._lock:
+            if version != self._version:
+                with self.pool.reader() as conn:
+                    self._tables = _load_schema(conn, self.pool.schemas)
+                self._by_folded_name = {
+                    fold_identifier(name): table for name, table in self._tables.items()
+                }
+                self._version = version
+                logger.debug(
+                    f"Loaded schema catalog: {len(self._tables)} tables (schema_version {version})"
+                )
+            return self._tables, self._by_folded_name
+
+    def table_names(self) -> list[str]:
+        tables, _ = self._current()
+        return [name for name, table in tables.items() if not table.is_view]
+
+    def table(self, name: str) -> TableSchema:
+        _, by_folded_name = self._current()
+        key = fold_identifier(name)
+        if key not in by_folded_name and key.startswith("main."):
+            key = key[len("main."):]
+        if key not in by_folded_name:
+            raise ValueError(f"Table not found: {name}")
+        return by_folded_name[key]
+
+    def describe_all(self) -> list[dict[str, Any]]:
+        """Every table's and view's columns, indexes, foreign keys and a row-count estimate"""
+        tables, _ = self._current()
+        with self.pool.reader() as conn:
+            estimates = _row_estimates(conn, tables)
+        described = []
+        for name, schema in tables.items():
+            entry = schema.to_dict()
+            entry["row_estimate"] = estimates.get(name)
+            described.append(entry)
+        return described
+
+
+def _load_schema(conn: sqlite3.Connection, databases: list[str]) -> dict[str, TableSchema]:
+    tables = {}
+    for database in databases:
+        entries = [
+            (name, kind)
+            for name, kind in conn.execute(
+                f"SELECT name, type FROM {quote_identifier(database)}.sqlite_master"
+                " WHERE type IN ('table', 'view')"
+            )
+            if not name.startswith(INTERNAL_TABLE_PREFIX)
+        ]
+        for name, kind in entries:
+            key = name if database == "main" else f"{database}.{name}"
+            tables[key] = _load_table(conn, database, name, key, kind)
+    return tables
+
+
+def _load_table(
+    conn: sqlite3.Connection, database: str, name: str, key: str, kind: str = "table"
+) -> TableSchema:
+    schema = TableSchema(key, database, kind)
+    schema.columns = conn.execute(
+        "SELECT cid, name, type, \"notnull\", dflt_value, pk FROM pragma_table_info(?, ?)",
+        (name, database),
+    ).fetchall()
+    if schema.is_view:
+        # Views have no indexes or foreign keys of their own
+        return schema
+    for index_name, unique, origin, partial in conn.execute(
+        "SELECT name, \"unique\", origin, partial FROM pragma_index_list(?, ?)", (name, database)
+    ).fetchall():
+        columns = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM pragma_index_info(?, ?) ORDER BY seqno", (index_name, database)
+            )
+        ]
+        schema.indexes.append(
+            {
+                "name": index_name,
+                "unique": bool(unique),
+                "origin": origin,
+                "partial": bool(partial),
+                "columns": columns,
+            }
+        )
+    schema.foreign_keys = [
+        {"id": fk_id, "seq": seq, "table": table, "from": from_, "to": to,
+         "on_update": on_update, "on_delete": on_delete}
+        for fk_id, seq, table, from_, to, on_update, on_delete, _ in conn.execute(
+            "SELECT * FROM pragma_foreign_key_list(?, ?)", (name, database)
+        )
+    ]
+    return schema
+
+
+def _row_estimates(conn: sqlite3.Connection, tables: dict[str, TableSchema]) -> dict[str, int | None]:
+    """Cheap row counts: sqlite_stat1 when ANALYZE has run, else MAX(rowid)"""
+    estimates: dict[str, int | None] = {}
+    for stat_table in tables.values():
+        if stat_table.table_name != "sqlite_stat1":
+            continue
+        prefix = "" if stat_table.schema == "main" else f"{stat_table.schema}."
+        for tbl, stat in conn.execute(f"SELECT tbl, stat FROM {stat_table.sql_name}"):
+            if stat and prefix + tbl not in estimates:
+                estimates[prefix + tbl] = int(str(stat).split()[0])
+    for name, schema in tables.items():
+        if name in estimates:
+            continue
+        if schema.is_view:
+            estimates[name] = None
+            continue
+        try:
+            estimates[name] = conn.execute(
+                f"SELECT MAX(rowid) FROM {schema.sql_name}"
+            ).fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID tables and virtual tables have no cheap estimate
+            estimates[name] = None
+    return estimates
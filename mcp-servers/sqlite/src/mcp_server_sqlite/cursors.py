@@ -0,0 +1,190 @@
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .budget import QueryGuard
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10000
+DEFAULT_MAX_OPEN_CURSORS = 8
+DEFAULT_CURSOR_TTL_SECONDS = 300.0
+
+
+class _OpenCursor:
+    """A live statement on its own connection, advanced one page at a time"""
+
+    def __init__(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor):
+        self.conn = conn
+        self.cursor = cursor
+        self.columns = [d[0] for d in cursor.description or ()]
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.closed = False
+        # One row of lookahead tells us whether another page exists
+        self.lookahead = cursor.fetchone()
+
+    def fetch(self, page_size: int, guard: QueryGuard) -> list[Any]:
+        rows = []
+        if self.lookahead is not None:
+            rows.append(self.lookahead)
+            self.lookahead = None
+            if page_size > 1:
+                rows.extend(guard.fetch(self.cursor, page_size - 1))
+            if guard.reason is None:
+                self.lookahead = next(iter(guard.fetch(self.cursor, 1)), None)
+            # A statement stopped by the guard cannot be resumed; the cursor
+            # reports itself exhausted and the page is returned as is
+        self.last_used = time.monotonic()
+        return rows
+
+    @property
+    def exhausted(self) -> bool:
+        return self.lookahead is None
+
+    def close(self) -> None:
+        self.closed = True
+        self.cursor.close()
+        self.conn.close()
+
+
+class CursorRegistry:
+    """Server-side cursors that back paginated read_query calls.
+
+    Each open cursor holds a dedicated read connection, so pages are
+    streamed with fetchmany and memory stays bounded by the page size rather
+    than by the size of the result. Cursors are closed once exhausted, after
+    ``ttl`` seconds of inactivity, or when more than ``max_open`` are live
+    (least recently used first).
+
+    Every call runs under a QueryGuard. A page cut short by the guard is
+    returned as is and its cursor is closed, since an interrupted statement
+    cannot be resumed; the guard's reason tells the caller why.
+
+    If given, on_statement(conn, query, params, started, rows) is called once
+    the first page is read, so the statement's execution and first fetch
+    are timed like any other.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        max_open: int = DEFAULT_MAX_OPEN_CURSORS,
+        ttl: float = DEFAULT_CURSOR_TTL_SECONDS,
+        on_statement: Callable[[sqlite3.Connection, str, Any, float, int], None] | None = None,
+    ):
+        self._connect = connect
+        self.max_open = max_open
+        self.ttl = ttl
+        self._on_statement = on_statement
+        self._cursors: OrderedDict[str, _OpenCursor] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(
+        self, query: str, params: Any, page_size: int, guard: QueryGuard
+    ) -> tuple[list[str], list[Any], str | None]:
+        """Execute a query and return its first page plus a continuation token"""
+        conn = self._connect()
+        try:
+            started = time.perf_counter()
+            with guard.watch(conn):
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                entry = _OpenCursor(conn, cursor)
+                rows = entry.fetch(page_size, guard)
+            if self._on_statement is not None:
+                self._on_statement(conn, query, params, started, len(rows))
+        except Exception as e:
+            try:
+                if guard.interrupted(e):
+                    # A statement stopped by the guard is the slowest kind; log it too
+                    if self._on_statement is not None:
+                        self._on_statement(conn, query, params, started, 0)
+                    return [], [], None
+                raise
+            finally:
+                conn.close()
+
+        if entry.exhausted:
+            entry.close()
+            return entry.columns, rows, None
+
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._cursors[token] = entry
+        self._sweep()
+        return entry.columns, rows, token
+
+    def fetch(
+        self, token: str, page_size: int, guard: QueryGuard
+    ) -> tuple[list[str], list[Any], str | None]:
+        """Return the next page for a continuation token"""
+        self._sweep()
+        with self._lock:
+            entry = self._cursors.get(token)
+            if entry is not None:
+                self._cursors.move_to_end(token)
+                entry.last_used = time.monotonic()
+        if entry is None:
+            raise _expired()
+
+        with entry.lock:
+            # _sweep may have expired the cursor between the lookup and the lock
+            with self._lock:
+                registered = self._cursors.get(token) is entry
+            if entry.closed or not registered:
+                raise _expired()
+            with guard.watch(entry.conn):
+                rows = entry.fetch(page_size, guard)
+            if not entry.exhausted:
+                return entry.columns, rows, token
+        self.close(token)
+        return entry.columns, rows, None
+
+    def close(self, token: str) -> None:
+        """Discard a cursor and release its connection"""
+        with self._lock:
+            entry = self._cursors.pop(token, None)
+        if entry is not None:
+            with entry.lock:
+                entry.close()
+
+    def _sweep(self) -> None:
+        """Close expired cursors and enforce the open-cursor bound"""
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                token
+                for token, entry in self._cursors.items()
+                if now - entry.last_used > self.ttl
+            ]
+            excess = len(self._cursors) - len(stale) - self.max_open
+            if excess > 0:
+                live = [t for t in self._cursors if t not in stale]
+                stale.extend(live[:excess])
+        for token in stale:
+            logger.debug(f"Closing idle cursor {token}")
+            self.close(token)
+
+    @property
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._cursors)
+
+    def close_all(self) -> None:
+        with self._lock:
+            tokens = list(self._cursors)
+        for token in tokens:
+            self.close(token)
+
+
+def _expired() -> ValueError:
+    return ValueError("Unknown or expired cursor; re-run the query")
@@ -0,0 +1,142 @@
+import dataclasses
+import logging
+import warnings
+from contextlib import AsyncExitStack, nullcontext
+from typing import Any, ContextManager
+
+import anyio
+import mcp.types as types
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from mcp.server import Server
+from mcp.server.models import InitializationOptions
+from mcp.server.session import ServerSession
+from mcp.shared.context import RequestContext
+from mcp.shared.exceptions import McpError
+from mcp.shared.session import RequestResponder
+
+try:
+    from mcp.server.lowlevel.server import request_ctx
+except ImportError:
+    # mcp 1.0 and 1.1 define the low-level server in mcp.server itself
+    from mcp.server import request_ctx
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_MAX_REQUESTS = 256
+
+# mcp 1.3 added server lifespans, carried on every request context, and made
+# RequestResponder a context manager that must be entered before responding
+_HAS_LIFESPAN = "lifespan_context" in {f.name for f in dataclasses.fields(RequestContext)}
+_RESPONDER_IS_CONTEXT = hasattr(RequestResponder, "__enter__")
+
+
+class ConcurrentServer(Server):
+    """An MCP server that handles each request in its own task.
+
+    The SDK's Server.run (before mcp 1.6) awaits every request handler
+    before reading the next message, so a long read_query holds up
+    list_tools, independent reads never overlap on the reader pool and
+    concurrent writes never meet in the group-commit queue. Here requests
+    run concurrently, responses are sent as each completes, and the query
+    executor bounds the database work underneath. At most max_requests are
+    in flight; past that, reading further messages waits for one to finish.
+    """
+
+    def __init__(self, name: str, max_requests: int = DEFAULT_MAX_REQUESTS):
+        super().__init__(name)
+        if max_requests < 1:
+            raise ValueError("max_requests must be at least 1")
+        self.max_requests = max_requests
+
+    async def run(
+        self,
+        read_stream: MemoryObjectReceiveStream[types.JSONRPCMessage | Exception],
+        write_stream: MemoryObjectSendStream[types.JSONRPCMessage],
+        initialization_options: InitializationOptions,
+        raise_exceptions: bool = False,
+    ):
+        limiter = anyio.CapacityLimiter(self.max_requests)
+        with warnings.catch_warnings(record=True) as w:
+            async with AsyncExitStack() as stack:
+                lifespan_context = None
+                if _HAS_LIFESPAN:
+                    lifespan_context = await stack.enter_async_context(self.lifespan(self))
+                session = await stack.enter_async_context(
+                    ServerSession(read_stream, write_stream, initialization_options)
+                )
+                async with anyio.create_task_group() as tg:
+                    async for message in session.incoming_messages:
+                        logger.debug(f"Received message: {message}")
+                        match message:
+                            case RequestResponder(request=types.ClientRequest(root=req)):
+                                await limiter.acquire_on_behalf_of(message)
+                                tg.start_soon(
+                                    self._serve_request,
+                                    session,
+                                    message,
+                                    req,
+                                    lifespan_context,
+                                    limiter,
+                                    raise_exceptions,
+                                )
+                            case types.ClientNotification(root=notify):
+                                await self._handle_notification(notify)
+
+                        for warning in w:
+                            logger.info(f"Warning: {warning.category.__name__}: {warning.message}")
+                        w.clear()
+
+    async def _serve_request(
+        self,
+        session: ServerSession,
+        message: RequestResponder,
+        req: types.Request,
+        lifespan_context: Any,
+        limiter: anyio.CapacityLimiter,
+        raise_exceptions: bool,
+    ) -> None:
+        try:
+            with _responding(message):
+                handler = self.request_handlers.get(type(req))
+                if handler is None:
+                    response = types.ErrorData(code=types.METHOD_NOT_FOUND, message="Method not found")
+                else:
+                    logger.debug(f"Dispatching request of type {type(req).__name__}")
+                    token = request_ctx.set(_request_context(message, session, lifespan_context))
+                    try:
+                        response = await handler(req)
+                    except McpError as err:
+                        response = err.error
+                    except Exception as err:
+                        if raise_exceptions:
+                            raise
+                        response = types.ErrorData(code=0, message=str(err), data=None)
+                    finally:
+                        request_ctx.reset(token)
+                try:
+                    await message.respond(response)
+                except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                    # The client went away while the request was running
+                    logger.debug(f"Dropped response to request {message.request_id}")
+        finally:
+            limiter.release_on_behalf_of(message)
+
+    async def _handle_notification(self, notify: types.Notification) -> None:
+        handler = self.notification_handlers.get(type(notify))
+        if handler is None:
+            return
+        try:
+            await handler(notify)
+        except Exception as err:
+            logger.error(f"Uncaught exception in notification handler: {err}")
+
+
+def _responding(message: RequestResponder) -> ContextManager:
+    """Enter the responder where the SDK requires it; a no-op before mcp 1.3"""
+    return message if _RESPONDER_IS_CONTEXT else nullcontext()
+
+
+def _request_context(message: RequestResponder, session: ServerSession, lifespan_context: Any) -> RequestContext:
+    if _HAS_LIFESPAN:
+        return RequestContext(message.request_id, message.request_meta, session, lifespan_context)
+    return RequestContext(message.request_id, message.request_meta, session)
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+T = TypeVar("T")
+
+DEFAULT_MAX_QUEUED = 64
+
+
+class QueryExecutor:
+    """Bounded thread pool that runs blocking database work off the event loop.
+
+    At most ``max_workers`` calls run at once and at most ``max_queued`` more
+    wait inside the thread pool; further callers wait on the event loop until
+    a slot frees up, so a burst of tool calls cannot pile up unbounded work.
+    """
+
+    def __init__(self, max_workers: int, max_queued: int = DEFAULT_MAX_QUEUED):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queued < 0:
+            raise ValueError("max_queued must not be negative")
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sqlite-query"
+        )
+        self._slots = asyncio.Semaphore(max_workers + max_queued)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on a worker thread and await its result"""
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            with self._lock:
+                self._queued += 1
+            depth = self.queue_depth
+            if depth > 0:
+                logger.debug(f"Query executor queue depth: {depth}")
+            future = self._pool.submit(self._call, func, args)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # Cancelled before a worker picked it up
+                    with self._lock:
+                        self._queued -= 1
+                raise
+        finally:
+            self._slots.release()
+
+    def _call(self, func: Callable[..., T], args: tuple[Any, ...]) -> T:
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls accepted but not yet running on a worker thread"""
+        with self._lock:
+            return self._waiting + self._queued
+
+    def stats(self) -> dict[str, int]:
+        """Snapshot of executor occupancy"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "active": self._active,
+                "queued": self._queued,
+                "waiting": self._waiting,
+                "completed": self._completed,
+            }
+
+    def shutdown(self) -> None:
+        """Wait for running calls to finish and stop the worker threads"""
+        self._pool.shutdown(wait=True)
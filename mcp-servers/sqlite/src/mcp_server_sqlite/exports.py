@@ -0,0 +1,235 @@
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from .budget import FETCH_BATCH_SIZE, QueryGuard
+from .formats import encode_rows
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+DEFAULT_EXPORT_CHUNK_BYTES = 1024 * 1024
+EXPORT_SCHEME = "export"
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$")
+_PART_SUFFIX = ".part"
+
+
+@dataclass
+class ExportInfo:
+    name: str
+    format: str
+    bytes: int
+    rows: int | None = None
+
+    @property
+    def uri(self) -> str:
+        return f"{EXPORT_SCHEME}://{self.name}"
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.format]
+
+    def chunks(self, chunk_bytes: int) -> int:
+        return max(1, -(-self.bytes // chunk_bytes))
+
+    def to_dict(self, chunk_bytes: int) -> dict[str, Any]:
+        return {
+            "uri": self.uri,
+            "format": self.format,
+            "mime_type": self.mime_type,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "chunks": self.chunks(chunk_bytes),
+            "chunk_uri": f"{self.uri}?chunk={{n}}",
+        }
+
+
+class ExportStore:
+    """Query results written to files under a data directory, served in chunks.
+
+    Rows are streamed from the cursor to disk in batches, so an export never
+    holds the whole result in memory. Each file is exposed as an export://
+    resource read one chunk at a time. Text chunks end on a line boundary
+    (chunk n starts at the first line at or after n * chunk_bytes), so every
+    chunk is valid UTF-8 and the chunks concatenate back to the exact file.
+    """
+
+    def __init__(self, data_dir: str | Path, chunk_bytes: int = DEFAULT_EXPORT_CHUNK_BYTES):
+        if chunk_bytes < 1:
+            raise ValueError("chunk_bytes must be at least 1")
+        self.data_dir = Path(data_dir).expanduser()
+        self.chunk_bytes = chunk_bytes
+        self._rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def write(
+        self,
+        cursor: sqlite3.Cursor,
+        fmt: str,
+        guard: QueryGuard,
+        name: str | None = None,
+    ) -> ExportInfo:
+        """Stream an executed cursor's rows into a new export file"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}. Expected one of: {', '.join(EXPORT_FORMATS)}")
+        if name is None:
+            name = time.strftime("export-%Y%m%d-%H%M%S-") + secrets.token_hex(3)
+        elif not _NAME.match(name):
+            raise ValueError("Export name may only contain letters, digits, '-' and '_'")
+        filename = f"{name}.{fmt}"
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        path = self.data_dir / filename
+        # Write beside the target and rename, so a half-written export is never listed
+        partial = path.with_name(filename + _PART_SUFFIX)
+
+        columns = [d[0] for d in cursor.description or ()]
+        try:
+            if fmt == "parquet":
+                rows = _write_parquet(partial, columns, cursor, guard)
+            else:
+                rows = _write_text(partial, columns, cursor, fmt, guard)
+            if guard.reason is not None:
+                raise ValueError(f"{guard.describe()}; the export was discarded")
+            os.replace(partial, path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._rows[filename] = rows
+        info = ExportInfo(filename, fmt, path.stat().st_size, rows)
+        logger.debug(f"Exported {rows} rows to {path} ({info.bytes} bytes)")
+        return info
+
+    def list(self) -> list[ExportInfo]:
+        """Every export in the data directory, including ones from earlier runs"""
+        if not self.data_dir.is_dir():
+            return []
+        exports = []
+        for path in sorted(self.data_dir.iterdir()):
+            info = self._info(path.name)
+            if info is not None:
+                exports.append(info)
+        return exports
+
+    def _info(self, filename: str) -> ExportInfo | None:
+        stem, _, fmt = filename.rpartition(".")
+        if fmt not in EXPORT_FORMATS or not _NAME.match(stem):
+            return None
+        path = self.data_dir / filename
+        if not path.is_file():
+            return None
+        with self._lock:
+            rows = self._rows.get(filename)
+        return ExportInfo(filename, fmt, path.stat().st_size, rows)
+
+    def read(self, uri: str) -> str | bytes:
+        """One chunk of an export: export://<file>?chunk=<n>, chunk 0 by default"""
+        parts = urlsplit(uri)
+        info = self._info(parts.netloc)
+        if parts.scheme != EXPORT_SCHEME or info is None:
+            raise ValueError(f"Unknown export: {uri}")
+        try:
+            chunk = int(parse_qs(parts.query).get("chunk", ["0"])[0])
+        except ValueError:
+            raise ValueError("chunk must be an integer")
+        if not 0 <= chunk < info.chunks(self.chunk_bytes):
+            raise ValueError(f"chunk must be between 0 and {info.chunks(self.chunk_bytes) - 1}")
+
+        with open(self.data_dir / info.name, "rb") as f:
+            if info.format == "parquet":
+                f.seek(chunk * self.chunk_bytes)
+                return f.read(self.chunk_bytes)
+            start = _line_start(f, chunk * self.chunk_bytes)
+            end = _line_start(f, (chunk + 1) * self.chunk_bytes)
+            f.seek(start)
+            return f.read(max(end - start, 0)).decode("utf-8")
+
+
+def _line_start(f: Any, offset: int) -> int:
+    """Offset of the first line starting at or after offset"""
+    if offset <= 0:
+        return 0
+    f.seek(offset - 1)
+    while True:
+        block = f.read(8192)
+        if not block:
+            return f.tell()
+        newline = block.find(b"\n")
+        if newline >= 0:
+            return f.tell() - len(block) + newline + 1
+
+
+def _write_text(path: Path, columns: list[str], cursor: sqlite3.Cursor, fmt: str, guard: QueryGuard) -> int:
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        if fmt == "csv":
+            out.write(encode_rows(columns, [], "csv"))
+        while True:
+            batch = guard.fetch(cursor, FETCH_BATCH_SIZE)
+            if batch:
+                text = encode_rows(columns, batch, fmt, header=False)
+                out.write(text if fmt == "csv" else text + "\n")
+                rows += len(batch)
+            if len(batch) < FETCH_BATCH_SIZE:
+                return rows
+
+
+def _write_parquet(path: Path, columns: list[str], cursor: sqlite3.Cursor, guard: QueryGuard) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow: install mcp-server-sqlite[parquet]")
+
+    rows = 0
+    writer = None
+    schema = None
+    try:
+        while True:
+            batch = guard.fetch(cursor, FETCH_BATCH_SIZE)
+            if batch or writer is None:
+                values = [list(col) for col in zip(*batch)] or [[] for _ in columns]
+                if schema is None:
+                    # Column types come from the first batch; all-NULL or mixed columns become strings
+                    types = []
+                    for col in values:
+                        try:
+                            inferred = pa.array(col).type
+                        except (pa.ArrowInvalid, pa.ArrowTypeError):
+                            inferred = pa.string()
+                        types.append(pa.string() if pa.types.is_null(inferred) else inferred)
+                    schema = pa.schema(list(zip(columns, types)))
+                    writer = pq.ParquetWriter(path, schema)
+                arrays = []
+                for field, col in zip(schema, values):
+                    try:
+                        arrays.append(pa.array(col, type=field.type))
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        if not pa.types.is_string(field.type):
+                            raise ValueError(
+                                f"Column {field.name} mixes value types; export as csv or ndjson instead"
+                            )
+                        arrays.append(pa.array([None if v is None else str(v) for v in col], type=field.type))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                rows += len(batch)
+            if len(batch) < FETCH_BATCH_SIZE:
+                return rows
+    finally:
+        if writer is not None:
+            writer.close()
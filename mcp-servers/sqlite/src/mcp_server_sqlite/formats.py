@@ -0,0 +1,80 @@
+import base64
+import csv
+import io
+import json
+from typing import Any, Iterable, Sequence
+
+# "repr" is the original Python-repr-of-dicts output and stays the default
+FORMATS = ("repr", "columnar", "csv", "ndjson")
+DEFAULT_FORMAT = "repr"
+
+FORMAT_SCHEMA = {
+    "type": "string",
+    "enum": list(FORMATS),
+    "default": DEFAULT_FORMAT,
+    "description": "Result encoding: repr (list of objects), columnar (JSON with column names once), csv or ndjson",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return value
+
+
+def encode_rows(
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    fmt: str = DEFAULT_FORMAT,
+    header: bool = True,
+) -> str:
+    """Encode result rows (plain tuples straight from sqlite3) as text.
+
+    header=False leaves out the CSV header line, for appending further
+    batches of rows to an earlier one.
+    """
+    if fmt == "repr":
+        return str([dict(zip(columns, row)) for row in rows])
+
+    if fmt == "columnar":
+        return _dumps({"columns": list(columns), "rows": [list(row) for row in rows]})
+
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        if header:
+            writer.writerow(columns)
+        for row in rows:
+            writer.writerow([_csv_value(v) for v in row])
+        return out.getvalue()
+
+    if fmt == "ndjson":
+        # Encode each key once and splice values in, rather than building a dict per row
+        keys = [_dumps(str(c)) + ":" for c in columns]
+        lines = []
+        for row in rows:
+            lines.append(
+                "{" + ",".join(k + _dumps(v) for k, v in zip(keys, row)) + "}"
+            )
+        return "\n".join(lines)
+
+    raise ValueError(f"Unknown format: {fmt}. Expected one of: {', '.join(FORMATS)}")
+
+
+def check_format(fmt: str | None) -> str:
+    """Validate a requested format, falling back to the default"""
+    if fmt is None:
+        return DEFAULT_FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}. Expected one of: {', '.join(FORMATS)}")
+    return fmt
@@ -0,0 +1,97 @@
+import io
+import logging
+import sqlite3
+import threading
+
+from .catalog import INTERNAL_TABLE_PREFIX
+from .pool import ConnectionPool
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+INSIGHTS_TABLE = f"{INTERNAL_TABLE_PREFIX}insights"
+
+MEMO_HEADER = "📊 Business Intelligence Memo 📊\n\nKey Insights Discovered:\n\n"
+EMPTY_MEMO = "No business insights have been discovered yet."
+
+
+class InsightsMemo:
+    """Business insights persisted in the database and rendered incrementally.
+
+    Insights live in an internal table so they survive restarts, and are
+    loaded on first use. The rendered bullet list only ever grows at the
+    end, and the finished memo is cached until the next append, so reading
+    memo://insights does not re-render every insight.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._insights: list[str] = []
+        self._body = io.StringIO()
+        self._memo: str | None = None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self.pool.reader() as conn:
+            try:
+                rows = conn.execute(
+                    f"SELECT insight FROM {INSIGHTS_TABLE} ORDER BY id"
+                ).fetchall()
+            except sqlite3.OperationalError:
+                # No insights table yet: nothing has been recorded
+                rows = []
+        for (insight,) in rows:
+            self._add(insight)
+        self._loaded = True
+        logger.debug(f"Loaded {len(self._insights)} insights")
+
+    def _add(self, insight: str) -> None:
+        if self._insights:
+            self._body.write("\n")
+        self._body.write(f"- {insight}")
+        self._insights.append(insight)
+        self._memo = None
+
+    def append(self, insight: str) -> None:
+        """Persist an insight and add it to the rendered memo"""
+        with self._lock:
+            self._ensure_loaded()
+            with self.pool.transaction() as conn:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {INSIGHTS_TABLE} ("
+                    "id INTEGER PRIMARY KEY, "
+                    "insight TEXT NOT NULL, "
+                    "created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+                )
+                conn.execute(
+                    f"INSERT INTO {INSIGHTS_TABLE} (insight) VALUES (?)", (insight,)
+                )
+            self._add(insight)
+
+    @property
+    def insights(self) -> list[str]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._insights)
+
+    def render(self) -> str:
+        """The memo text, rebuilt only after an insight has been appended"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._memo is None:
+                self._memo = self._synthesize()
+            return self._memo
+
+    def _synthesize(self) -> str:
+        count = len(self._insights)
+        logger.debug(f"Synthesizing memo with {count} insights")
+        if not count:
+            return EMPTY_MEMO
+
+        memo = MEMO_HEADER + self._body.getvalue()
+        if count > 1:
+            memo += "\nSummary:\n"
+            memo += f"Analysis has revealed {count} key business insights that suggest opportunities for strategic optimization and growth."
+        return memo
@@ -0,0 +1,124 @@
+import bisect
+import threading
+import time
+from typing import Any
+
+# Log-spaced latency buckets from 10µs to ~170s, four per doubling (~19% wide)
+_BUCKET_BOUNDS = [10e-6 * 2 ** (i / 4) for i in range(0, 97)]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is a bisect and an increment"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(_BUCKET_BOUNDS):
+                    return min(_BUCKET_BOUNDS[index], self.max)
+                return self.max
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """Latency summary in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class _Counters:
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.rows = 0
+        self.bytes = 0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "calls": self.latency.count,
+            "errors": self.errors,
+            "latency": self.latency.summary(),
+            "rows": self.rows,
+            "bytes": self.bytes,
+        }
+
+
+class ServerMetrics:
+    """Low-overhead counters for tool calls, SQLite statements and serialization.
+
+    Tool latency covers a whole call_tool request; SQLite latency covers
+    executing and fetching statements; serialization covers encoding rows to
+    text. Comparing the three shows where the time of a slow call goes.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._tools: dict[str, _Counters] = {}
+        self._sqlite = _Counters()
+        self._serialization = _Counters()
+
+    def record_tool(self, name: str, seconds: float, nbytes: int, error: bool) -> None:
+        with self._lock:
+            counters = self._tools.get(name)
+            if counters is None:
+                counters = self._tools[name] = _Counters()
+            counters.latency.record(seconds)
+            counters.bytes += nbytes
+            if error:
+                counters.errors += 1
+
+    def record_tool_rows(self, name: str, rows: int) -> None:
+        with self._lock:
+            counters = self._tools.get(name)
+            if counters is None:
+                counters = self._tools[name] = _Counters()
+            counters.rows += rows
+
+    def record_statement(self, seconds: float, rows: int) -> None:
+        with self._lock:
+            self._sqlite.latency.record(seconds)
+            self._sqlite.rows += max(rows, 0)
+
+    def record_serialization(self, seconds: float, rows: int, nbytes: int) -> None:
+        with self._lock:
+            self._serialization.latency.record(seconds)
+            self._serialization.rows += rows
+            self._serialization.bytes += nbytes
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            sqlite = self._sqlite.summary()
+            sqlite["statements"] = sqlite.pop("calls")
+            del sqlite["errors"], sqlite["bytes"]
+            serialization = self._serialization.summary()
+            del serialization["errors"]
+            return {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "tools": {name: c.summary() for name, c in sorted(self._tools.items())},
+                "sqlite": sqlite,
+                "serialization": serialization,
+            }
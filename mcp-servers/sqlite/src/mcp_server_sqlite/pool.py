@@ -0,0 +1,233 @@
+import logging
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_READERS = 4
+DEFAULT_CACHE_SIZE_KIB = 16384
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_STATEMENT_CACHE_SIZE = 256
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+_SCHEMA_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class StatementCacheStats:
+    """Hit/miss accounting for the per-connection prepared-statement caches.
+
+    sqlite3 does not expose its statement cache, so this mirrors it: an LRU
+    of SQL texts per connection with the same capacity. A hit here means the
+    connection could reuse an already prepared statement.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._seen: dict[int, OrderedDict[str, None]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, conn: sqlite3.Connection, sql: str) -> None:
+        with self._lock:
+            seen = self._seen.setdefault(id(conn), OrderedDict())
+            if sql in seen:
+                seen.move_to_end(sql)
+                self.hits += 1
+                return
+            self.misses += 1
+            seen[sql] = None
+            if len(seen) > self.capacity:
+                seen.popitem(last=False)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections: one writer plus a fixed set of readers.
+
+    The database is switched to WAL journal mode so readers never block the
+    writer (and vice versa). Every connection keeps its own warm page cache
+    for the lifetime of the server instead of being reopened per query.
+
+    Readers are opened through a mode=ro URI with PRAGMA query_only set, so
+    SQLite itself refuses any write on them and they never take write locks.
+    They also memory-map up to mmap_size bytes of the database file, letting
+    large scans read pages straight from the OS page cache.
+
+    Further database files can be attached under schema names (see
+    ``attach``); every pooled connection attaches all of them, so queries can
+    join across databases and one process serves them all.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = DEFAULT_READERS,
+        cache_size_kib: int = DEFAULT_CACHE_SIZE_KIB,
+        busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+        statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        attach: dict[str, str] | None = None,
+    ):
+        if readers < 1:
+            raise ValueError("Connection pool needs at least one reader")
+        self.attached = dict(attach or {})
+        for name in self.attached:
+            if not _SCHEMA_NAME.match(name) or name.lower() in ("main", "temp"):
+                raise ValueError(f"Invalid database name to attach: {name!r}")
+        self.schemas = ["main", *self.attached]
+        self.db_path = db_path
+        self.cache_size_kib = cache_size_kib
+        self.busy_timeout_ms = busy_timeout_ms
+        self.statement_cache_size = statement_cache_size
+        self.mmap_size = max(mmap_size, 0)
+        self.statements = StatementCacheStats(statement_cache_size)
+        self._closed = False
+
+        # The writer runs in autocommit mode; transactions are explicit
+        # (see transaction()) so multi-statement writes commit exactly once.
+        # It is opened first so the database file and its WAL index exist
+        # before any read-only connection needs them.
+        self._writer = self._connect(db_path, isolation_level=None)
+        for name, path in self.attached.items():
+            self._writer.execute(f"ATTACH DATABASE ? AS {name}", (path,))
+        for schema in self.schemas:
+            mode = self._writer.execute(f"PRAGMA {schema}.journal_mode=WAL").fetchone()[0]
+            if mode.lower() != "wal":
+                logger.warning(f"Could not enable WAL journal mode for {schema}, using {mode}")
+            self._writer.execute(f"PRAGMA {schema}.synchronous=NORMAL")
+            self._writer.execute(f"PRAGMA {schema}.cache_size=-{int(self.cache_size_kib)}")
+        self._writer_lock = threading.Lock()
+
+        self.readers = readers
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        for _ in range(readers):
+            self._readers.put(self._connect_read_only())
+        # Dedicated connection for version checks; PRAGMA data_version only
+        # changes for commits made by *other* connections, so it must not be
+        # the writer.
+        self._probe = self._connect_read_only()
+        self._probe_lock = threading.Lock()
+        logger.debug(
+            f"Opened connection pool: 1 writer, {readers} readers, {len(self.schemas)} databases"
+        )
+
+    def _connect(self, database: str, **kwargs: Any) -> sqlite3.Connection:
+        """Open a connection configured for pooled, cross-thread use"""
+        conn = sqlite3.connect(
+            database,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+            **kwargs,
+        )
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _connect_read_only(self) -> sqlite3.Connection:
+        """Open a read-only, memory-mapped connection with every database attached"""
+        conn = self._connect(_read_only_uri(self.db_path), uri=True)
+        for name, path in self.attached.items():
+            conn.execute(f"ATTACH DATABASE ? AS {name}", (_read_only_uri(path),))
+        conn.execute("PRAGMA query_only=ON")
+        for schema in self.schemas:
+            conn.execute(f"PRAGMA {schema}.mmap_size={int(self.mmap_size)}")
+            conn.execute(f"PRAGMA {schema}.cache_size=-{int(self.cache_size_kib)}")
+        return conn
+
+    def connect_reader(self) -> sqlite3.Connection:
+        """Open an unpooled reader for callers that hold it across requests"""
+        return self._connect_read_only()
+
+    def data_version(self) -> tuple[int, ...]:
+        """Value that changes whenever any connection commits to any attached database"""
+        return self._versions("data_version")
+
+    def schema_version(self) -> tuple[int, ...]:
+        """Value that changes whenever the schema of any attached database changes"""
+        return self._versions("schema_version")
+
+    def _versions(self, pragma: str) -> tuple[int, ...]:
+        with self._probe_lock:
+            return tuple(
+                self._probe.execute(f"PRAGMA {schema}.{pragma}").fetchone()[0]
+                for schema in self.schemas
+            )
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a reader connection, blocking until one is free"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Take exclusive ownership of the writer connection"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        with self._writer_lock:
+            yield self._writer
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block on the writer inside a single committed transaction"""
+        with self.writer() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of pool occupancy"""
+        return {
+            "databases": self.schemas,
+            "readers": self.readers,
+            "readers_in_use": self.readers - self._readers.qsize(),
+            "writer_busy": self._writer_lock.locked(),
+            "mmap_size": self.mmap_size,
+        }
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        if self._closed:
+            return
+        self._closed = True
+        with self._writer_lock:
+            self._writer.close()
+        with self._probe_lock:
+            self._probe.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        logger.debug("Closed connection pool")
+
+
+def _read_only_uri(path: str) -> str:
+    return Path(path).expanduser().resolve().as_uri() + "?mode=ro"
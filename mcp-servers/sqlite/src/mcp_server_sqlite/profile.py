@@ -0,0 +1,329 @@
+import base64
+import heapq
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Hashable, Sequence
+
+from .budget import QueryGuard
+from .catalog import TableSchema, quote_identifier
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 50
+DEFAULT_HISTOGRAM_BINS = 10
+MAX_HISTOGRAM_BINS = 100
+MAX_SAMPLE_ROWS = 1_000_000
+DEFAULT_PROFILE_CACHE_SIZE = 64
+
+# Rows fetched and folded into the column summaries at a time
+PROFILE_BATCH_SIZE = 1024
+# Numeric values sampled per column to draw its histogram from
+HISTOGRAM_SAMPLE = 10000
+# HyperLogLog registers (2**12): about 1.6% standard error on distinct counts
+HLL_PRECISION = 12
+
+_MASK64 = (1 << 64) - 1
+_TYPE_NAMES = {int: "integer", float: "real", str: "text", bytes: "blob"}
+# SQLite's cross-type ordering: numbers sort before text, text before blobs
+_TYPE_ORDER = {int: 0, float: 0, str: 1, bytes: 2}
+
+
+def _mix64(value: Hashable) -> int:
+    """Spread Python's hash over 64 bits (SplitMix64 finalizer); small ints hash to themselves"""
+    x = (hash(value) + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class HyperLogLog:
+    """Distinct-count sketch in 2**precision bytes, whatever the number of values"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Hashable) -> None:
+        h = _mix64(value)
+        bits = 64 - self.precision
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        raw = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate while most registers are empty
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+
+class Reservoir:
+    """Uniform random sample of a stream, fed in batches (Li's Algorithm L).
+
+    Once the reservoir is full, the number of items to skip before the next
+    replacement is drawn directly, so skipped items cost nothing.
+    """
+
+    def __init__(self, size: int, rng: random.Random):
+        self.size = size
+        self.items: list[Any] = []
+        self.seen = 0
+        self._rng = rng
+        self._weight = 1.0
+        self._next = 0
+
+    def extend(self, items: Sequence[Any]) -> None:
+        offset = self.seen
+        self.seen += len(items)
+        if len(self.items) < self.size:
+            take = self.size - len(self.items)
+            self.items.extend(items[:take])
+            if len(self.items) < self.size:
+                return
+            self._weight = self._draw()
+            self._next = offset + take - 1 + self._skip()
+        while self._next < self.seen:
+            self.items[self._rng.randrange(self.size)] = items[self._next - offset]
+            self._weight *= self._draw()
+            self._next += self._skip()
+
+    def _draw(self) -> float:
+        return math.exp(math.log(1.0 - self._rng.random()) / self.size)
+
+    def _skip(self) -> int:
+        return math.floor(math.log(1.0 - self._rng.random()) / math.log1p(-self._weight)) + 1
+
+
+class ColumnProfile:
+    """One column's summary, updated a batch of values at a time.
+
+    Top values are a mergeable Misra-Gries summary: counts are exact until
+    the column has more distinct values than the summary holds, after which
+    they are lower bounds within rows / capacity of the truth.
+    """
+
+    def __init__(self, name: str, declared_type: str, top_k: int, bins: int, rng: random.Random):
+        self.name = name
+        self.declared_type = declared_type
+        self.top_k = top_k
+        self.bins = bins
+        self.capacity = max(100, 20 * top_k)
+        self.rows = 0
+        self.nulls = 0
+        self.types: Counter[str] = Counter()
+        self.sketch = HyperLogLog()
+        self.counts: dict[Any, int] = {}
+        self.exact = True
+        self.min: Any = None
+        self.max: Any = None
+        self.numeric_count = 0
+        self.numeric_sum = 0.0
+        self.numeric_min: float | None = None
+        self.numeric_max: float | None = None
+        self.numbers = Reservoir(HISTOGRAM_SAMPLE, rng)
+
+    def update(self, values: Sequence[Any]) -> None:
+        self.rows += len(values)
+        nulls = values.count(None)
+        self.nulls += nulls
+        if nulls:
+            values = [v for v in values if v is not None]
+        if not values:
+            return
+
+        batch = Counter(values)
+        counts = self.counts
+        for value, n in batch.items():
+            self.sketch.add(value)
+            self.types[_TYPE_NAMES.get(type(value), "other")] += n
+            counts[value] = counts.get(value, 0) + n
+        if len(counts) > self.capacity:
+            floor = heapq.nlargest(self.capacity + 1, counts.values())[-1]
+            self.counts = {v: n - floor for v, n in counts.items() if n > floor}
+            self.exact = False
+
+        low, high = _extremes(values)
+        if self.min is None or _sort_key(low) < _sort_key(self.min):
+            self.min = low
+        if self.max is None or _sort_key(high) > _sort_key(self.max):
+            self.max = high
+
+        numbers = [v for v in values if type(v) in (int, float)]
+        if numbers:
+            self.numeric_count += len(numbers)
+            self.numeric_sum += sum(numbers)
+            low, high = min(numbers), max(numbers)
+            self.numeric_min = low if self.numeric_min is None else min(self.numeric_min, low)
+            self.numeric_max = high if self.numeric_max is None else max(self.numeric_max, high)
+            self.numbers.extend(numbers)
+
+    def to_dict(self) -> dict[str, Any]:
+        top = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:self.top_k]
+        non_null = self.rows - self.nulls
+        profile: dict[str, Any] = {
+            "name": self.name,
+            "declared_type": self.declared_type,
+            "count": non_null,
+            "nulls": self.nulls,
+            "null_fraction": round(self.nulls / self.rows, 6) if self.rows else None,
+            "types": dict(self.types),
+            "distinct": len(self.counts) if self.exact else self.sketch.estimate(),
+            "distinct_exact": self.exact,
+            "min": _plain(self.min),
+            "max": _plain(self.max),
+            "top_values": [{"value": _plain(v), "count": n} for v, n in top],
+            "top_values_exact": self.exact,
+        }
+        if self.numeric_count:
+            profile["mean"] = self.numeric_sum / self.numeric_count
+            profile["histogram"] = self._histogram()
+            profile["histogram_sampled"] = self.numbers.seen > len(self.numbers.items)
+        return profile
+
+    def _histogram(self) -> list[dict[str, Any]]:
+        """Equal-width bins over the exact numeric range, counted from the sample"""
+        low, high = self.numeric_min, self.numeric_max
+        sample = self.numbers.items
+        scale = self.numbers.seen / len(sample)
+        if low == high:
+            return [{"low": low, "high": high, "count": self.numeric_count}]
+        if not math.isfinite(high - low):
+            return []
+        width = (high - low) / self.bins
+        counts = [0] * self.bins
+        for value in sample:
+            counts[min(int((value - low) / width), self.bins - 1)] += 1
+        return [
+            {"low": low + i * width, "high": low + (i + 1) * width, "count": round(n * scale)}
+            for i, n in enumerate(counts)
+        ]
+
+
+def profile_table(
+    conn: Any,
+    table: TableSchema,
+    columns: list[str],
+    guard: QueryGuard,
+    top_k: int = DEFAULT_TOP_K,
+    bins: int = DEFAULT_HISTOGRAM_BINS,
+    sample_rows: int = 0,
+) -> dict[str, Any]:
+    """Profile a table's columns in a single scan.
+
+    With sample_rows, a uniform reservoir sample of that many rows is drawn
+    during the scan and the statistics describe the sample; otherwise every
+    row is summarized. If the guard stops the scan, the profile covers the
+    rows read until then.
+    """
+    declared = {col[1]: col[2] for col in table.columns}
+    rng = random.Random()
+    profiles = [ColumnProfile(col, declared[col], top_k, bins, rng) for col in columns]
+    sample = Reservoir(sample_rows, rng) if sample_rows > 0 else None
+    query = "SELECT {} FROM {}".format(", ".join(quote_identifier(col) for col in columns), table.sql_name)
+
+    started = time.perf_counter()
+    scanned = 0
+    with guard.watch(conn):
+        cursor = conn.execute(query)
+        try:
+            while True:
+                batch = guard.fetch(cursor, PROFILE_BATCH_SIZE)
+                scanned += len(batch)
+                if sample is not None:
+                    sample.extend(batch)
+                elif batch:
+                    _update(profiles, batch)
+                if len(batch) < PROFILE_BATCH_SIZE or guard.check():
+                    break
+        finally:
+            cursor.close()
+    if sample is not None and sample.items:
+        _update(profiles, sample.items)
+
+    elapsed = time.perf_counter() - started
+    logger.debug(f"Profiled {len(columns)} columns of {table.name} over {scanned} rows in {elapsed:.3f}s")
+    return {
+        "table": table.name,
+        "rows_scanned": scanned,
+        "rows_profiled": len(sample.items) if sample is not None else scanned,
+        "sampled": sample is not None and sample.seen > len(sample.items),
+        "seconds": round(elapsed, 6),
+        "columns": [profile.to_dict() for profile in profiles],
+    }
+
+
+def _update(profiles: list[ColumnProfile], rows: list[tuple]) -> None:
+    for profile, values in zip(profiles, zip(*rows)):
+        profile.update(values)
+
+
+class ProfileCache:
+    """Recent table profiles, all dropped as soon as the database changes (see ResultCache)"""
+
+    def __init__(self, capacity: int = DEFAULT_PROFILE_CACHE_SIZE):
+        self.capacity = capacity
+        self._entries: OrderedDict[Hashable, dict[str, Any]] = OrderedDict()
+        self._version: Hashable = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Hashable) -> dict[str, Any] | None:
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            profile = self._entries.get(key)
+            if profile is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return profile
+
+    def put(self, key: Hashable, version: Hashable, profile: dict[str, Any]) -> None:
+        with self._lock:
+            if version != self._version or self.capacity <= 0:
+                return
+            self._entries[key] = profile
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def _extremes(values: Sequence[Any]) -> tuple[Any, Any]:
+    try:
+        return min(values), max(values)
+    except TypeError:
+        # Mixed storage classes; order them the way SQLite does
+        return min(values, key=_sort_key), max(values, key=_sort_key)
+
+
+def _sort_key(value: Any) -> tuple[int, Any]:
+    return _TYPE_ORDER.get(type(value), 3), value
+
+
+def _plain(value: Any) -> Any:
+    """A JSON-friendly value: blobs are base64-encoded, as in the result formats"""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return value
@@ -0,0 +1,100 @@
+import re
+
+from .catalog import INTERNAL_TABLE_PREFIX, TableSchema, quote_identifier, quote_table
+
+# Tokenizer choices offered to clients, mapped to FTS5 tokenize= arguments
+SEARCH_TOKENIZERS = {
+    "unicode61": "unicode61 remove_diacritics 2",
+    "porter": "porter unicode61 remove_diacritics 2",
+    "trigram": "trigram",
+}
+DEFAULT_TOKENIZER = "unicode61"
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 1000
+DEFAULT_SNIPPET_TOKENS = 12
+
+_TERM = re.compile(r"\S+")
+
+
+def search_table_name(table: str) -> str:
+    """Name of the FTS5 table indexing a table; internal, so the schema tools hide it"""
+    return f"{INTERNAL_TABLE_PREFIX}fts_{table}"
+
+
+def index_statements(table: TableSchema, columns: list[str], tokenizer: str) -> list[str]:
+    """Statements that (re)build an external-content FTS5 index and its sync triggers.
+
+    The index stores only the tokens; column values are read from the
+    table itself. Triggers keep it in step with every insert, delete and
+    update of an indexed column, and 'rebuild' indexes the existing rows.
+    The index and triggers live in the table's own database.
+    """
+    fts_name = search_table_name(table.table_name)
+    # Trigger bodies may not qualify table names; they resolve in the trigger's database
+    fts = quote_identifier(fts_name)
+    source = quote_identifier(table.table_name)
+    cols = ", ".join(quote_identifier(col) for col in columns)
+    new = ", ".join(f"new.{quote_identifier(col)}" for col in columns)
+    old = ", ".join(f"old.{quote_identifier(col)}" for col in columns)
+    trigger = {
+        suffix: quote_table(table.schema, f"{fts_name}_{suffix}") for suffix in ("ai", "ad", "au")
+    }
+    tokenize = SEARCH_TOKENIZERS[tokenizer].replace("'", "''")
+    return [
+        *drop_statements(table),
+        f"CREATE VIRTUAL TABLE {quote_table(table.schema, fts_name)} USING fts5({cols}, "
+        f"content={_literal(table.table_name)}, "
+        f"content_rowid='rowid', tokenize='{tokenize}')",
+        f"CREATE TRIGGER {trigger['ai']} AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.rowid, {new}); END",
+        f"CREATE TRIGGER {trigger['ad']} AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); END",
+        f"CREATE TRIGGER {trigger['au']} AFTER UPDATE OF {cols} ON {source} BEGIN "
+        f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); "
+        f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.rowid, {new}); END",
+        f"INSERT INTO {quote_table(table.schema, fts_name)} ({fts}) VALUES ('rebuild')",
+    ]
+
+
+def drop_statements(table: TableSchema) -> list[str]:
+    fts_name = search_table_name(table.table_name)
+    return [
+        *(
+            f"DROP TRIGGER IF EXISTS {quote_table(table.schema, f'{fts_name}_{suffix}')}"
+            for suffix in ("ai", "ad", "au")
+        ),
+        f"DROP TABLE IF EXISTS {quote_table(table.schema, fts_name)}",
+    ]
+
+
+def search_query(table: TableSchema, snippet_tokens: int = DEFAULT_SNIPPET_TOKENS) -> str:
+    """BM25-ranked matches joined back to their rows, best first.
+
+    Takes two parameters: the FTS5 match expression and the row limit.
+    _score is the BM25 score (lower is a better match) and _snippet the
+    best-matching fragment with the matched terms in [brackets].
+    """
+    fts_name = search_table_name(table.table_name)
+    # FTS5 functions and MATCH take the table's own (unqualified) name, not an alias. The
+    # FROM clause always names the schema: unqualified, SQLite would fall through from
+    # main to an attached database's index of a same-named table
+    fts = quote_identifier(fts_name)
+    return (
+        f"SELECT t.*, snippet({fts}, -1, '[', ']', '…', {int(snippet_tokens)}) AS _snippet, "
+        f"bm25({fts}) AS _score "
+        f"FROM {quote_identifier(table.schema)}.{fts} JOIN {table.sql_name} AS t ON t.rowid = {fts}.rowid "
+        f"WHERE {fts} MATCH ? ORDER BY rank LIMIT ?"
+    )
+
+
+def match_expression(text: str) -> str:
+    """Turn plain search text into an FTS5 query matching rows containing every term"""
+    terms = _TERM.findall(text)
+    if not terms:
+        raise ValueError("Search query must contain at least one term")
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
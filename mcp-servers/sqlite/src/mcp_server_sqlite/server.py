@@ -1,5 +1,10 @@
 import os
 import sys
+import asyncio
+import csv
+import io
+import json
+import time
 import sqlite3
 import logging
 from contextlib import closing
@@ -9,7 +14,66 @@ import mcp.types as types
 from mcp.server import NotificationOptions, Server
 import mcp.server.stdio
 from pydantic import AnyUrl
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Sequence, TypeVar
+from .budget import (
+    DEFAULT_MAX_RESULT_ROWS,
+    DEFAULT_MAX_VM_STEPS,
+    DEFAULT_QUERY_TIMEOUT_MS,
+    QueryBudget,
+    QueryGuard,
+)
+from .cache import (
+    DEFAULT_RESULT_CACHE_BYTES,
+    ResultCache,
+    is_cacheable,
+    normalize_sql,
+    params_key,
+)
+from .catalog import SchemaCatalog, TABLE_INFO_COLUMNS, TableSchema, quote_identifier, quote_table
+from .cursors import CursorRegistry, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .dispatch import ConcurrentServer
+from .executor import QueryExecutor, DEFAULT_MAX_QUEUED
+from .exports import EXPORT_FORMATS, EXPORT_SCHEME, ExportInfo, ExportStore
+from .formats import FORMAT_SCHEMA, check_format, encode_rows
+from .memo import InsightsMemo
+from .metrics import ServerMetrics
+from .pool import (
+    ConnectionPool,
+    DEFAULT_CACHE_SIZE_KIB,
+    DEFAULT_MMAP_SIZE,
+    DEFAULT_READERS,
+    DEFAULT_STATEMENT_CACHE_SIZE,
+)
+from .profile import (
+    DEFAULT_HISTOGRAM_BINS,
+    DEFAULT_TOP_K,
+    MAX_HISTOGRAM_BINS,
+    MAX_SAMPLE_ROWS,
+    MAX_TOP_K,
+    ProfileCache,
+    profile_table,
+)
+from .search import (
+    DEFAULT_SEARCH_LIMIT,
+    DEFAULT_SNIPPET_TOKENS,
+    DEFAULT_TOKENIZER,
+    MAX_SEARCH_LIMIT,
+    SEARCH_TOKENIZERS,
+    index_statements,
+    match_expression,
+    search_query,
+    search_table_name,
+)
+from .snapshot import DEFAULT_SNAPSHOT_PAUSE_MS, DEFAULT_SNAPSHOT_STEP_PAGES, SnapshotInfo, SnapshotStore
+from .slowlog import (
+    DEFAULT_SLOW_LOG_SIZE,
+    DEFAULT_SLOW_QUERY_MS,
+    SlowQuery,
+    SlowQueryLog,
+    advise_indexes,
+    format_plan,
+)
+from .writes import DEFAULT_WRITE_BATCH_SIZE, DEFAULT_WRITE_FLUSH_MS, PendingWrite, WriteQueue
 
 # reconfigure UnicodeEncodeError prone default (i.e. windows-1252) to utf-8
 if sys.platform == "win32" and os.environ.get('PYTHONIOENCODING') is None:
@@ -20,6 +84,40 @@ if sys.platform == "win32" and os.environ.get('PYTHONIOENCODING') is None:
 logger = logging.getLogger('mcp_sqlite_server')
 logger.info("Starting MCP SQLite Server")
 
+# Positional (?) or named (:name) statement parameters
+QueryParams = list[Any] | dict[str, Any]
+
+T = TypeVar("T")
+
+PARAMS_SCHEMA = {
+    "type": ["array", "object"],
+    "description": "Values bound to ? placeholders (array) or :name placeholders (object). Prefer parameters over inlining values so repeated queries reuse prepared statements.",
+}
+
+TIMEOUT_SCHEMA = {
+    "type": "number",
+    "exclusiveMinimum": 0,
+    "description": "Stop the query after this many milliseconds. Can only tighten the server's own time budget.",
+}
+
+MAX_ROWS_SCHEMA = {
+    "type": "integer",
+    "minimum": 1,
+    "description": "Return at most this many rows; a truncation notice follows when more exist. Can only tighten the server's own row budget.",
+}
+
+DEFAULT_INSERT_CHUNK_SIZE = 500
+
+# Statements that would interfere with a transaction managed by the server
+TRANSACTION_PREFIXES = ('BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+# Statements read_query accepts; read-only reader connections refuse any
+# write that slips through (e.g. a WITH ... DELETE)
+READ_PREFIXES = ('SELECT', 'WITH')
+
+# Statements routed to the writer connection and committed
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER', 'REPLACE')
+
 PROMPT_TEMPLATE = """
 The assistants goal is to walkthrough an informative demo of MCP. To demonstrate the Model Context Protocol (MCP) we will leverage this example server to interact with an SQLite database.
 It is important that you first explain to the user what is going on. The user has downloaded and installed the SQLite MCP Server and is now ready to use it.
@@ -101,69 +199,811 @@ The provided XML tags are for the assistants understanding. Implore to make all
 Start your first message fully in character with something like "Oh, Hey there! I see you've chosen the topic {topic}. Let's get started! 🚀"
 """
 
+
+class _TransactionLost(Exception):
+    """SQLite rolled back a group commit's whole transaction"""
+
+
 class SqliteDatabase:
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = DEFAULT_READERS,
+        cache_size_kib: int = DEFAULT_CACHE_SIZE_KIB,
+        max_concurrency: int | None = None,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE,
+        result_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+        slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+        slow_log_size: int = DEFAULT_SLOW_LOG_SIZE,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        query_timeout_ms: float = DEFAULT_QUERY_TIMEOUT_MS,
+        max_vm_steps: int = DEFAULT_MAX_VM_STEPS,
+        max_result_rows: int = DEFAULT_MAX_RESULT_ROWS,
+        data_dir: str | None = None,
+        attach: dict[str, str] | None = None,
+        write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        write_flush_ms: float = DEFAULT_WRITE_FLUSH_MS,
+        snapshot_dir: str | None = None,
+    ):
         self.db_path = str(Path(db_path).expanduser())
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._init_database()
-        self.insights: list[str] = []
+        # Attached database files, by schema name
+        self.attached = {name: str(Path(path).expanduser()) for name, path in (attach or {}).items()}
+        for path in self.attached.values():
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_database(readers, cache_size_kib, statement_cache_size, mmap_size)
+        # One worker per pooled connection unless told otherwise
+        self.executor = QueryExecutor(
+            max_concurrency or readers + 1, max_queued=max_queued
+        )
+        self.cursors = CursorRegistry(self.pool.connect_reader, on_statement=self._time_statement)
+        self.writes = WriteQueue(self._commit_writes, self.executor, write_batch_size, write_flush_ms)
+        self.results = ResultCache(result_cache_bytes)
+        self.profiles = ProfileCache()
+        self.catalog = SchemaCatalog(self.pool)
+        self.slow_log = SlowQueryLog(slow_query_ms, slow_log_size)
+        self.metrics = ServerMetrics()
+        self.memo = InsightsMemo(self.pool)
+        self.budget = QueryBudget(query_timeout_ms, max_vm_steps, max_result_rows)
+        # Exports live beside the database unless told otherwise
+        self.exports = ExportStore(data_dir or Path(self.db_path).parent / "exports")
+        self.snapshots = SnapshotStore(snapshot_dir or Path(self.db_path).parent / "snapshots")
 
-    def _init_database(self):
-        """Initialize connection to the SQLite database"""
-        logger.debug("Initializing database connection")
-        with closing(sqlite3.connect(self.db_path)) as conn:
-            conn.row_factory = sqlite3.Row
-            conn.close()
+    def _init_database(
+        self,
+        readers: int,
+        cache_size_kib: int,
+        statement_cache_size: int,
+        mmap_size: int,
+    ):
+        """Open the long-lived connection pool for the SQLite database"""
+        logger.debug("Initializing database connection pool")
+        self.pool = ConnectionPool(
+            self.db_path,
+            readers=readers,
+            cache_size_kib=cache_size_kib,
+            statement_cache_size=statement_cache_size,
+            mmap_size=mmap_size,
+            attach=self.attached,
+        )
 
-    def _synthesize_memo(self) -> str:
-        """Synthesizes business insights into a formatted memo"""
-        logger.debug(f"Synthesizing memo with {len(self.insights)} insights")
-        if not self.insights:
-            return "No business insights have been discovered yet."
+    def close(self):
+        """Stop the query executor and release all pooled connections"""
+        self.executor.shutdown()
+        self.cursors.close_all()
+        self.pool.close()
 
-        insights = "\n".join(f"- {insight}" for insight in self.insights)
+    def guard(self, timeout_ms: float | None = None, max_rows: int | None = None) -> QueryGuard:
+        """A guard for one call, under the server's budget tightened by per-call limits"""
+        return QueryGuard(self.budget.limit(timeout_ms, max_rows))
 
-        memo = "📊 Business Intelligence Memo 📊\n\n"
-        memo += "Key Insights Discovered:\n\n"
-        memo += insights
+    async def run_guarded(self, guard: QueryGuard, func: Callable[..., T], *args: Any) -> T:
+        """Run func on the query executor, interrupting its statement if the call is cancelled"""
+        try:
+            return await self.executor.run(func, *args)
+        except asyncio.CancelledError:
+            guard.cancel()
+            raise
+
+    async def execute(
+        self, query: str, params: QueryParams | None = None, guard: QueryGuard | None = None
+    ) -> list[dict[str, Any]]:
+        """Run a write_query statement on the writer without blocking the event loop.
+
+        INSERT, UPDATE, DELETE and DDL are group-committed, unless the batch
+        size is 1, when each commits on its own without queueing. Anything else
+        (ANALYZE, VACUUM, REINDEX, PRAGMA, WITH ... INSERT) runs on the writer
+        on its own, outside an explicit transaction, since some of those
+        statements cannot run inside one.
+        """
+        guard = guard or self.guard()
+        if _is_write_statement(query) and self.writes.max_batch <= 1:
+            return [{"affected_rows": await self.run_guarded(guard, self._execute_write, query, params, guard)}]
+        if _is_write_statement(query):
+            logger.debug(f"Queueing write: {query}")
+            return [{"affected_rows": await self.writes.submit(query, params, guard)}]
+        return await self.run_guarded(guard, self._execute_standalone, query, params, guard)
+
+    async def fetch_rows(
+        self, query: str, params: QueryParams | None = None, guard: QueryGuard | None = None
+    ) -> tuple[list[str], list[tuple]]:
+        """Run _execute_rows on the query executor, serving repeats from the result cache.
+
+        A result cut short by the guard is returned as is, with guard.reason
+        saying why, and is never cached.
+        """
+        guard = guard or self.guard()
+        if not (self.results.enabled and is_cacheable(query)):
+            return await self.run_guarded(guard, self._execute_rows, query, params, guard)
+
+        key = (normalize_sql(query), params_key(params))
+        # Read the version before the query so a commit racing with it
+        # makes the stored result unreachable rather than stale
+        version = self.pool.data_version()
+        cached = self.results.get(key, version)
+        if cached is not None:
+            logger.debug(f"Result cache hit: {query}")
+            columns, rows = cached
+            max_rows = guard.budget.max_rows
+            if 0 < max_rows < len(rows):
+                guard.reason = "max_rows"
+                rows = rows[:max_rows]
+            return columns, rows
+        columns, rows = await self.run_guarded(guard, self._execute_rows, query, params, guard)
+        if guard.reason is None:
+            self.results.put(key, version, columns, rows)
+        return columns, rows
+
+    async def read_page(
+        self,
+        query: str | None,
+        params: QueryParams | None = None,
+        cursor: str | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        guard: QueryGuard | None = None,
+    ) -> tuple[list[str], list[tuple], str | None]:
+        """Read one page of a query, or the next page of an open cursor.
 
-        if len(self.insights) > 1:
-            memo += "\nSummary:\n"
-            memo += f"Analysis has revealed {len(self.insights)} key business insights that suggest opportunities for strategic optimization and growth."
+        Returns the column names, the page's rows and the continuation token
+        for the next page (None once the result is exhausted, or once the
+        guard has stopped the query).
+        """
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        guard = guard or self.guard()
+        if cursor:
+            return await self.run_guarded(guard, self.cursors.fetch, cursor, page_size, guard)
+        if not query:
+            raise ValueError("Missing query or cursor argument")
+        logger.debug(f"Executing paginated query: {query}")
+        return await self.run_guarded(guard, self.cursors.open, query, params, page_size, guard)
 
-        logger.debug("Generated basic memo format")
-        return memo
+    def encode(self, tool: str, columns: list[str], rows: list[tuple], fmt: str) -> str:
+        """Encode result rows for a tool response, recording serialization metrics"""
+        started = time.perf_counter()
+        text = encode_rows(columns, rows, fmt)
+        self.metrics.record_serialization(
+            time.perf_counter() - started, len(rows), _utf8_len(text)
+        )
+        self.metrics.record_tool_rows(tool, len(rows))
+        return text
+
+    def stats(self) -> dict[str, Any]:
+        """Performance metrics plus pool, executor and cache occupancy"""
+        snapshot = self.metrics.snapshot()
+        snapshot["pool"] = {**self.pool.stats(), "open_cursors": self.cursors.open_count}
+        snapshot["executor"] = self.executor.stats()
+        snapshot["caches"] = {
+            "results": self.results.stats(),
+            "profiles": self.profiles.stats(),
+            "statements": self.pool.statements.stats(),
+        }
+        snapshot["writes"] = self.writes.stats()
+        return snapshot
+
+    @property
+    def insights(self) -> list[str]:
+        """Business insights recorded so far, oldest first"""
+        return self.memo.insights
+
+    def _synthesize_memo(self) -> str:
+        """Synthesizes business insights into a formatted memo"""
+        return self.memo.render()
 
-    def _execute_query(self, query: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    def _execute_query(
+        self, query: str, params: QueryParams | None = None, guard: QueryGuard | None = None
+    ) -> list[dict[str, Any]]:
         """Execute a SQL query and return results as a list of dictionaries"""
-        logger.debug(f"Executing query: {query}")
+        guard = guard or self.guard()
+        if _is_write_statement(query):
+            return [{"affected_rows": self._execute_write(query, params, guard)}]
+        if _is_read_statement(query):
+            columns, rows = self._execute_rows(query, params, guard)
+            return [dict(zip(columns, row)) for row in rows]
+        return self._execute_standalone(query, params, guard)
+
+    def _execute_write(
+        self, query: str, params: QueryParams | None = None, guard: QueryGuard | None = None
+    ) -> int:
+        """Execute a statement on the writer in its own transaction, returning affected rows"""
+        logger.debug(f"Executing write: {query}")
+        guard = guard or self.guard()
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.pool.transaction() as conn:
+                self.pool.statements.record(conn, query)
                 with closing(conn.cursor()) as cursor:
-                    if params:
-                        cursor.execute(query, params)
+                    started = time.perf_counter()
+                    with guard.watch(conn):
+                        if params:
+                            cursor.execute(query, params)
+                        else:
+                            cursor.execute(query)
+                    affected = cursor.rowcount
+                    self._time_statement(conn, query, params, started, affected)
+            self.results.invalidate()
+            logger.debug(f"Write query affected {affected} rows")
+            return affected
+        except Exception as e:
+            if guard.interrupted(e):
+                logger.warning(f"{guard.describe()}: {query}")
+                raise ValueError(f"{guard.describe()}; the write was rolled back") from e
+            logger.error(f"Database error executing query: {e}")
+            raise
+
+    def _execute_standalone(
+        self, query: str, params: QueryParams | None = None, guard: QueryGuard | None = None
+    ) -> list[dict[str, Any]]:
+        """Execute a statement on the writer in autocommit mode.
+
+        Returns the rows it produced (e.g. for a PRAGMA), or its affected-row
+        count if it produced none.
+        """
+        if query.strip().upper().startswith(TRANSACTION_PREFIXES):
+            raise ValueError("Transaction control is not allowed here; use execute_batch for multi-statement transactions")
+        logger.debug(f"Executing on writer: {query}")
+        guard = guard or self.guard()
+        try:
+            with self.pool.writer() as conn:
+                self.pool.statements.record(conn, query)
+                try:
+                    with closing(conn.cursor()) as cursor:
+                        started = time.perf_counter()
+                        # rowcount is -1 for statements sqlite3 does not take for DML,
+                        # such as WITH ... INSERT, so count the changes directly
+                        changes = conn.total_changes
+                        with guard.watch(conn):
+                            if params:
+                                cursor.execute(query, params)
+                            else:
+                                cursor.execute(query)
+                            if cursor.description:
+                                columns = [d[0] for d in cursor.description]
+                                results = [dict(zip(columns, row)) for row in guard.fetch_result(cursor)]
+                            else:
+                                results = [{"affected_rows": conn.total_changes - changes}]
+                        self._time_statement(conn, query, params, started, len(results))
+                finally:
+                    if conn.in_transaction:
+                        # Never leave the shared writer inside a transaction
+                        conn.execute("ROLLBACK")
+            self.results.invalidate()
+            return results
+        except Exception as e:
+            if guard.interrupted(e):
+                logger.warning(f"{guard.describe()}: {query}")
+                raise ValueError(f"{guard.describe()}; the statement was stopped") from e
+            logger.error(f"Database error executing query: {e}")
+            raise
+
+    def _commit_writes(self, batch: list[PendingWrite]) -> None:
+        """Run queued writes in one transaction, each under its own savepoint.
+
+        A failing write is rolled back to its savepoint and its error recorded
+        on it; the others still commit. Some failures (an interrupted
+        statement, ON CONFLICT ROLLBACK) roll back the whole transaction;
+        the remaining writes are then run again in a new one.
+        """
+        while batch:
+            try:
+                with self.pool.transaction() as conn:
+                    for write in batch:
+                        self._run_queued_write(conn, write)
+            except _TransactionLost:
+                batch = [write for write in batch if write.error is None]
+                logger.debug(f"Retrying {len(batch)} queued writes in a new transaction")
+            else:
+                break
+        self.results.invalidate()
+
+    def _run_queued_write(self, conn: sqlite3.Connection, write: PendingWrite) -> None:
+        conn.execute("SAVEPOINT queued_write")
+        try:
+            self.pool.statements.record(conn, write.query)
+            with closing(conn.cursor()) as cursor:
+                started = time.perf_counter()
+                with write.guard.watch(conn):
+                    if write.params:
+                        cursor.execute(write.query, write.params)
                     else:
-                        cursor.execute(query)
+                        cursor.execute(write.query)
+                write.affected = cursor.rowcount
+                self._time_statement(conn, write.query, write.params, started, write.affected)
+        except Exception as e:
+            if write.guard.interrupted(e):
+                logger.warning(f"{write.guard.describe()}: {write.query}")
+                write.error = ValueError(f"{write.guard.describe()}; the write was rolled back")
+            else:
+                logger.error(f"Database error executing query: {e}")
+                write.error = e
+            if not conn.in_transaction:
+                raise _TransactionLost() from e
+            conn.execute("ROLLBACK TO queued_write")
+        conn.execute("RELEASE queued_write")
 
-                    if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER')):
-                        conn.commit()
-                        affected = cursor.rowcount
-                        logger.debug(f"Write query affected {affected} rows")
-                        return [{"affected_rows": affected}]
+    def _insert_rows(
+        self,
+        table: str,
+        columns: list[str],
+        rows: Iterable[Sequence[Any]],
+        chunk_size: int = DEFAULT_INSERT_CHUNK_SIZE,
+    ) -> dict[str, Any]:
+        """Insert rows with executemany in chunks, all inside a single transaction"""
+        schema = self.catalog.table(table)
+        columns = schema.resolve_columns(columns)
+        if not columns:
+            raise ValueError("At least one column is required")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
 
-                    results = [dict(row) for row in cursor.fetchall()]
-                    logger.debug(f"Read query returned {len(results)} rows")
-                    return results
+        query = "INSERT INTO {} ({}) VALUES ({})".format(
+            schema.sql_name,
+            ", ".join(quote_identifier(col) for col in columns),
+            ", ".join("?" for _ in columns),
+        )
+        logger.debug(f"Bulk inserting into {table} in chunks of {chunk_size}")
+        started = time.perf_counter()
+        inserted = 0
+        chunks = 0
+        try:
+            with self.pool.transaction() as conn:
+                with closing(conn.cursor()) as cursor:
+                    for chunk in _chunked(rows, chunk_size):
+                        for offset, row in enumerate(chunk):
+                            if len(row) != len(columns):
+                                raise ValueError(
+                                    f"Row {inserted + offset} has {len(row)} values, expected {len(columns)}"
+                                )
+                        self.pool.statements.record(conn, query)
+                        chunk_started = time.perf_counter()
+                        cursor.executemany(query, chunk)
+                        # The first row stands in for the chunk when a slow insert's plan is explained
+                        self._time_statement(conn, query, chunk[0], chunk_started, len(chunk))
+                        inserted += len(chunk)
+                        chunks += 1
+            self.results.invalidate()
+        except Exception as e:
+            logger.error(f"Database error bulk inserting into {table}: {e}")
+            raise
+        elapsed = time.perf_counter() - started
+        logger.debug(f"Inserted {inserted} rows into {table} in {elapsed:.3f}s")
+        return {
+            "rows_inserted": inserted,
+            "chunks": chunks,
+            "seconds": round(elapsed, 6),
+            "rows_per_second": round(inserted / elapsed) if elapsed > 0 else None,
+        }
+
+    def _execute_batch(
+        self, statements: list[tuple[str, QueryParams | None]], guard: QueryGuard | None = None
+    ) -> list[int]:
+        """Run statements in order in one transaction, rolling back if any fails"""
+        logger.debug(f"Executing batch of {len(statements)} statements")
+        guard = guard or self.guard()
+        affected = []
+        try:
+            with self.pool.transaction() as conn:
+                with closing(conn.cursor()) as cursor:
+                    for index, (query, params) in enumerate(statements):
+                        self.pool.statements.record(conn, query)
+                        started = time.perf_counter()
+                        try:
+                            with guard.watch(conn):
+                                if params:
+                                    cursor.execute(query, params)
+                                else:
+                                    cursor.execute(query)
+                        except sqlite3.Error as e:
+                            if guard.interrupted(e):
+                                raise
+                            raise type(e)(
+                                f"Statement {index} failed, batch rolled back: {e}"
+                            ) from e
+                        affected.append(cursor.rowcount)
+                        self._time_statement(conn, query, params, started, cursor.rowcount)
+            self.results.invalidate()
+        except Exception as e:
+            if guard.interrupted(e):
+                logger.warning(f"{guard.describe()}: batch of {len(statements)} statements")
+                raise ValueError(f"{guard.describe()}; the batch was rolled back") from e
+            logger.error(f"Database error executing batch: {e}")
+            raise
+        return affected
+
+    def _time_statement(
+        self,
+        conn: sqlite3.Connection,
+        query: str,
+        params: QueryParams | None,
+        started: float,
+        rows: int,
+    ) -> None:
+        """Record a statement's timing, and log it if it exceeded the slow-query threshold"""
+        elapsed = time.perf_counter() - started
+        self.metrics.record_statement(elapsed, rows)
+        if not self.slow_log.is_slow(elapsed):
+            return
+        try:
+            plan = format_plan(self._plan_rows(conn, query, params))
+        except sqlite3.Error:
+            plan = []
+        self.slow_log.record(
+            SlowQuery(query, repr(params) if params else None, elapsed, rows, plan)
+        )
+
+    def _plan_rows(self, conn: sqlite3.Connection, query: str, params: QueryParams | None) -> list[tuple]:
+        if params:
+            return conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+
+    def _explain(self, query: str, params: QueryParams | None = None) -> list[str]:
+        """EXPLAIN QUERY PLAN for a statement, without running it"""
+        with self.pool.reader() as conn:
+            return format_plan(self._plan_rows(conn, query, params))
+
+    async def profile(
+        self,
+        table: str,
+        columns: list[str] | None = None,
+        top_k: int = DEFAULT_TOP_K,
+        bins: int = DEFAULT_HISTOGRAM_BINS,
+        sample_rows: int = 0,
+        guard: QueryGuard | None = None,
+    ) -> dict[str, Any]:
+        """Profile a table's columns in one scan, serving repeats from the profile cache.
+
+        Profiles are cached until PRAGMA data_version changes; a profile cut
+        short by the guard is returned with guard.reason set and not cached.
+        """
+        if not 0 < top_k <= MAX_TOP_K:
+            raise ValueError(f"top_k must be between 1 and {MAX_TOP_K}")
+        if not 0 < bins <= MAX_HISTOGRAM_BINS:
+            raise ValueError(f"bins must be between 1 and {MAX_HISTOGRAM_BINS}")
+        if not 0 <= sample_rows <= MAX_SAMPLE_ROWS:
+            raise ValueError(f"sample_rows must be between 0 and {MAX_SAMPLE_ROWS}")
+        schema = await self.executor.run(self.catalog.table, table)
+        columns = schema.resolve_columns(columns) if columns else schema.column_names
+
+        guard = guard or self.guard()
+        key = (schema.name, tuple(columns), top_k, bins, sample_rows)
+        version = self.pool.data_version()
+        cached = self.profiles.get(key, version)
+        if cached is not None:
+            logger.debug(f"Profile cache hit: {schema.name}")
+            return cached
+        result = await self.run_guarded(
+            guard, self._profile_table, schema, columns, top_k, bins, sample_rows, guard
+        )
+        if guard.reason is None:
+            self.profiles.put(key, version, result)
+        return result
+
+    def _profile_table(
+        self,
+        schema: TableSchema,
+        columns: list[str],
+        top_k: int,
+        bins: int,
+        sample_rows: int,
+        guard: QueryGuard,
+    ) -> dict[str, Any]:
+        try:
+            with self.pool.reader() as conn:
+                return profile_table(conn, schema, columns, guard, top_k, bins, sample_rows)
+        except Exception as e:
+            if guard.interrupted(e):
+                logger.warning(f"{guard.describe()}: profiling {schema.name}")
+                raise ValueError(f"{guard.describe()} before any rows were profiled") from e
+            logger.error(f"Database error profiling {schema.name}: {e}")
+            raise
+
+    def _advise_indexes(self, query: str | None = None, params: QueryParams | None = None) -> dict[str, Any]:
+        """Index suggestions for one query, or for every query in the slow-query log"""
+        if query:
+            entries = [SlowQuery(query, None, 0.0, 0, self._explain(query, params))]
+        else:
+            entries = self.slow_log.entries()
+
+        def lookup_table(table: str) -> TableSchema | None:
+            try:
+                return self.catalog.table(table)
+            except ValueError:
+                return None
+
+        return {
+            "queries_analyzed": len(entries),
+            "suggestions": advise_indexes(entries, lookup_table),
+        }
+
+    def _export(
+        self,
+        query: str,
+        params: QueryParams | None,
+        fmt: str,
+        name: str | None = None,
+        guard: QueryGuard | None = None,
+    ) -> ExportInfo:
+        """Stream a read query's result from a pooled reader into an export file"""
+        logger.debug(f"Exporting query as {fmt}: {query}")
+        guard = guard or self.guard()
+        try:
+            with self.pool.reader() as conn:
+                self.pool.statements.record(conn, query)
+                with closing(conn.cursor()) as cursor:
+                    started = time.perf_counter()
+                    with guard.watch(conn):
+                        if params:
+                            cursor.execute(query, params)
+                        else:
+                            cursor.execute(query)
+                        info = self.exports.write(cursor, fmt, guard, name)
+                    self._time_statement(conn, query, params, started, info.rows or 0)
+                    return info
+        except Exception as e:
+            if guard.interrupted(e):
+                logger.warning(f"{guard.describe()}: {query}")
+                raise ValueError(f"{guard.describe()}; the export was discarded") from e
+            logger.error(f"Database error exporting query: {e}")
+            raise
+
+    def _snapshot(
+        self,
+        name: str | None = None,
+        database: str = "main",
+        incremental: bool = False,
+        step_pages: int = DEFAULT_SNAPSHOT_STEP_PAGES,
+        pause_ms: float = DEFAULT_SNAPSHOT_PAUSE_MS,
+        guard: QueryGuard | None = None,
+    ) -> SnapshotInfo:
+        """Copy a database into a snapshot file with the online backup API, on its own connection.
+
+        An incremental follow-up of an earlier snapshot returns it as is when
+        the data has not changed since it was taken, and refreshes it otherwise.
+        """
+        if database not in self.pool.schemas:
+            raise ValueError(f"Unknown database: {database}. Expected one of: {', '.join(self.pool.schemas)}")
+        guard = guard or QueryGuard(QueryBudget(0, 0, 0))
+        version = self.pool.data_version()
+        if incremental:
+            if not name:
+                raise ValueError("An incremental snapshot needs the name of an earlier snapshot")
+            current = self.snapshots.current(name, database, version)
+            if current is not None:
+                logger.debug(f"Snapshot {name} is up to date")
+                return current
+        source = self.pool.connect_reader()
+        try:
+            return self.snapshots.take(source, guard, version, name, database, step_pages, pause_ms)
+        finally:
+            source.close()
+
+    def _create_search_index(
+        self, table: str, columns: list[str], tokenizer: str = DEFAULT_TOKENIZER
+    ) -> dict[str, Any]:
+        """Build (or rebuild) the FTS5 index over a table's columns, kept in sync by triggers"""
+        schema = self.catalog.table(table)
+        if schema.is_view:
+            raise ValueError(f"Cannot build a search index over a view: {table}")
+        if not columns:
+            raise ValueError("At least one column is required")
+        columns = schema.resolve_columns(columns)
+        if tokenizer not in SEARCH_TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer: {tokenizer}. Expected one of: {', '.join(SEARCH_TOKENIZERS)}")
+
+        logger.debug(f"Building search index on {table} ({', '.join(columns)})")
+        started = time.perf_counter()
+        try:
+            with self.pool.transaction() as conn:
+                try:
+                    conn.execute(f"SELECT rowid FROM {schema.sql_name} LIMIT 0")
+                except sqlite3.OperationalError:
+                    raise ValueError(f"Table {table} has no rowid (WITHOUT ROWID tables cannot be indexed)")
+                for statement in index_statements(schema, columns, tokenizer):
+                    conn.execute(statement)
+                fts = quote_table(schema.schema, search_table_name(schema.table_name))
+                rows = conn.execute(f"SELECT COUNT(*) FROM {fts}").fetchone()[0]
+            self.results.invalidate()
+        except sqlite3.OperationalError as e:
+            if "no such module: fts5" in str(e):
+                raise ValueError("This SQLite build does not include FTS5") from e
+            logger.error(f"Database error building search index on {table}: {e}")
+            raise
+        elapsed = time.perf_counter() - started
+        logger.debug(f"Indexed {rows} rows of {table} in {elapsed:.3f}s")
+        return {
+            "table": schema.name,
+            "columns": columns,
+            "tokenizer": tokenizer,
+            "rows_indexed": rows,
+            "seconds": round(elapsed, 6),
+        }
+
+    async def search(
+        self,
+        table: str,
+        text: str,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        raw: bool = False,
+        snippet_tokens: int = DEFAULT_SNIPPET_TOKENS,
+        guard: QueryGuard | None = None,
+    ) -> tuple[list[str], list[tuple]]:
+        """BM25-ranked full-text matches from a table's search index"""
+        if not 0 < limit <= MAX_SEARCH_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        if not 0 < snippet_tokens <= 64:
+            raise ValueError("snippet_tokens must be between 1 and 64")
+        expression = text if raw else match_expression(text)
+        schema = await self.executor.run(self.catalog.table, table)
+        try:
+            return await self.fetch_rows(
+                search_query(schema, snippet_tokens), [expression, limit], guard
+            )
+        except sqlite3.OperationalError as e:
+            if search_table_name(schema.table_name) in str(e) and "no such table" in str(e):
+                raise ValueError(
+                    f"No search index on table {table}; build one with create_search_index"
+                ) from e
+            raise
+
+    def _execute_rows(
+        self, query: str, params: QueryParams | None = None, guard: QueryGuard | None = None
+    ) -> tuple[list[str], list[tuple]]:
+        """Execute a read query on a pooled reader, returning column names and row tuples.
+
+        The guard bounds the query's time, VM steps and rows; if it stops the
+        query, the rows read so far are returned and guard.reason says why.
+        """
+        logger.debug(f"Executing query: {query}")
+        guard = guard or self.guard()
+        try:
+            with self.pool.reader() as conn:
+                self.pool.statements.record(conn, query)
+                with closing(conn.cursor()) as cursor:
+                    started = time.perf_counter()
+                    columns: list[str] = []
+                    rows: list[tuple] = []
+                    with guard.watch(conn):
+                        try:
+                            if params:
+                                cursor.execute(query, params)
+                            else:
+                                cursor.execute(query)
+                        except sqlite3.OperationalError as e:
+                            if not guard.interrupted(e):
+                                raise
+                        else:
+                            columns = [d[0] for d in cursor.description or ()]
+                            rows = guard.fetch_result(cursor)
+                    self._time_statement(conn, query, params, started, len(rows))
+                    if guard.reason is not None:
+                        logger.warning(f"{guard.describe()}: {query}")
+                    logger.debug(f"Read query returned {len(rows)} rows")
+                    return columns, rows
         except Exception as e:
             logger.error(f"Database error executing query: {e}")
             raise
 
-async def main(db_path: str):
-    logger.info(f"Starting SQLite MCP Server with DB path: {db_path}")
 
-    db = SqliteDatabase(db_path)
-    server = Server("sqlite-manager")
+def _is_read_statement(query: str) -> bool:
+    """Whether read_query accepts a statement"""
+    return query.strip().upper().startswith(READ_PREFIXES)
+
+
+def _is_write_statement(query: str) -> bool:
+    """Whether a statement is a plain data or schema change, safe to group-commit"""
+    return query.strip().upper().startswith(WRITE_PREFIXES)
+
+
+def _query_params(arguments: dict[str, Any]) -> QueryParams | None:
+    """Validate the optional params argument of a query tool"""
+    params = arguments.get("params")
+    if params is None or isinstance(params, (list, dict)):
+        return params
+    raise ValueError("params must be an array (positional) or an object (named)")
+
+
+def _call_guard(db: SqliteDatabase, arguments: dict[str, Any]) -> QueryGuard:
+    """Guard for a tool call, applying its optional timeout_ms and max_rows"""
+    timeout_ms = arguments.get("timeout_ms")
+    max_rows = arguments.get("max_rows")
+    return db.guard(
+        float(timeout_ms) if timeout_ms is not None else None,
+        int(max_rows) if max_rows is not None else None,
+    )
+
+
+def _batch_statements(arguments: dict[str, Any]) -> list[tuple[str, QueryParams | None]]:
+    """Validate the statements argument of execute_batch"""
+    statements = arguments.get("statements")
+    if not isinstance(statements, list) or not statements:
+        raise ValueError("statements must be a non-empty array")
+    batch = []
+    for index, statement in enumerate(statements):
+        if isinstance(statement, str):
+            statement = {"query": statement}
+        if not isinstance(statement, dict) or not isinstance(statement.get("query"), str):
+            raise ValueError(f"Statement {index} must be an object with a query")
+        if statement["query"].strip().upper().startswith(TRANSACTION_PREFIXES):
+            raise ValueError(f"Statement {index}: execute_batch manages the transaction itself")
+        batch.append((statement["query"], _query_params(statement)))
+    return batch
+
+
+def _chunked(rows: Iterable[Sequence[Any]], size: int) -> Iterator[list[Sequence[Any]]]:
+    """Split an iterable of rows into lists of at most size rows"""
+    chunk: list[Sequence[Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert_source(arguments: dict[str, Any]) -> tuple[list[str], Iterable[Sequence[Any]]]:
+    """Columns and rows for insert_rows, from either a rows array or a CSV payload"""
+    columns = arguments.get("columns")
+    if "rows" in arguments:
+        if not columns:
+            raise ValueError("columns are required with rows")
+        if not isinstance(arguments["rows"], list):
+            raise ValueError("rows must be an array of arrays")
+        return columns, arguments["rows"]
+    if "csv" in arguments:
+        reader = csv.reader(io.StringIO(arguments["csv"]))
+        if not columns:
+            # Without an explicit column list the first line is the header
+            columns = next(reader, None)
+            if not columns:
+                raise ValueError("CSV payload has no header line")
+        return columns, reader
+    raise ValueError("Missing rows or csv argument")
+
+
+def _page_contents(
+    db: SqliteDatabase,
+    name: str,
+    columns: list[str],
+    rows: list[tuple],
+    page_size: int,
+    next_cursor: str | None,
+    fmt: str,
+    guard: QueryGuard,
+) -> list[types.TextContent]:
+    """Render one page of a paginated read_query"""
+    state: dict[str, Any] = {"page_size": page_size, "next_cursor": next_cursor}
+    if guard.reason is not None:
+        state.update(guard.status(len(rows)))
+    if fmt == "repr":
+        db.metrics.record_tool_rows(name, len(rows))
+        page = {"rows": [dict(zip(columns, row)) for row in rows], **state}
+        return [types.TextContent(type="text", text=str(page))]
+    # Structured formats carry the rows alone; paging state follows as JSON
+    meta = json.dumps(state)
+    return [
+        types.TextContent(type="text", text=db.encode(name, columns, rows, fmt)),
+        types.TextContent(type="text", text=meta),
+    ]
+
+
+def _utf8_len(text: str) -> int:
+    """UTF-8 size of a string, without encoding it in the common ASCII case"""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def _content_bytes(contents: list[types.TextContent | types.ImageContent | types.EmbeddedResource]) -> int:
+    """UTF-8 size of the text in a tool response"""
+    return sum(
+        _utf8_len(content.text)
+        for content in contents
+        if isinstance(content, types.TextContent)
+    )
+
+
+def create_server(db: SqliteDatabase) -> Server:
+    """Build the MCP server for a database, with every resource, prompt and tool handler registered"""
+    server = ConcurrentServer("sqlite-manager")
 
     # Register handlers
     logger.debug("Registering handlers")
@@ -177,12 +1017,32 @@ async def main(db_path: str):
                 name="Business Insights Memo",
                 description="A living document of discovered business insights",
                 mimeType="text/plain",
+            ),
+            types.Resource(
+                uri=AnyUrl("stats://server"),
+                name="Server Performance Metrics",
+                description="Per-tool call counts and latency percentiles, SQLite and serialization timings, pool occupancy and cache hit rates",
+                mimeType="application/json",
+            ),
+        ] + [
+            types.Resource(
+                uri=AnyUrl(export.uri),
+                name=f"Query export {export.name}",
+                description=f"{export.format.upper()} export, {export.bytes} bytes in {export.chunks(db.exports.chunk_bytes)} chunks; append ?chunk=N to read chunk N",
+                mimeType=export.mime_type,
             )
+            for export in await db.executor.run(db.exports.list)
         ]
 
     @server.read_resource()
-    async def handle_read_resource(uri: AnyUrl) -> str:
+    async def handle_read_resource(uri: AnyUrl) -> str | bytes:
         logger.debug(f"Handling read_resource request for URI: {uri}")
+        if str(uri) == "stats://server":
+            return json.dumps(db.stats(), indent=2)
+
+        if uri.scheme == EXPORT_SCHEME:
+            return await db.executor.run(db.exports.read, str(uri))
+
         if uri.scheme != "memo":
             logger.error(f"Unsupported URI scheme: {uri.scheme}")
             raise ValueError(f"Unsupported URI scheme: {uri.scheme}")
@@ -192,7 +1052,7 @@ async def main(db_path: str):
             logger.error(f"Unknown resource path: {path}")
             raise ValueError(f"Unknown resource path: {path}")
 
-        return db._synthesize_memo()
+        return await db.executor.run(db._synthesize_memo)
 
     @server.list_prompts()
     async def handle_list_prompts() -> list[types.Prompt]:
@@ -242,26 +1102,81 @@ async def main(db_path: str):
         return [
             types.Tool(
                 name="read_query",
-                description="Execute a SELECT query on the SQLite database",
+                description="Execute a SELECT query on the SQLite database. Pass page_size to read large results in pages, then pass the returned next_cursor to fetch the following page. Queries that exceed the time or row budget are stopped and return the rows read so far with a truncation notice.",
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "query": {"type": "string", "description": "SELECT SQL query to execute"},
+                        "params": PARAMS_SCHEMA,
+                        "page_size": {
+                            "type": "integer",
+                            "description": f"Return at most this many rows and a next_cursor for the rest (max {MAX_PAGE_SIZE})",
+                            "minimum": 1,
+                            "maximum": MAX_PAGE_SIZE,
+                        },
+                        "cursor": {"type": "string", "description": "next_cursor from a previous paginated read_query call"},
+                        "format": FORMAT_SCHEMA,
+                        "timeout_ms": TIMEOUT_SCHEMA,
+                        "max_rows": MAX_ROWS_SCHEMA,
+                    },
+                },
+            ),
+            types.Tool(
+                name="export_query",
+                description="Run a SELECT query and stream its full result into a CSV, NDJSON or Parquet file instead of returning it inline. Returns an export:// resource URI with the row count and size; read the file through resources/read, one chunk at a time.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "SELECT SQL query to export"},
+                        "params": PARAMS_SCHEMA,
+                        "format": {
+                            "type": "string",
+                            "enum": list(EXPORT_FORMATS),
+                            "default": "csv",
+                            "description": "File format; parquet requires pyarrow",
+                        },
+                        "name": {"type": "string", "description": "File name without extension (letters, digits, '-' and '_'); an existing export of the same name is replaced"},
+                        "timeout_ms": TIMEOUT_SCHEMA,
                     },
                     "required": ["query"],
                 },
             ),
             types.Tool(
                 name="write_query",
-                description="Execute an INSERT, UPDATE, or DELETE query on the SQLite database",
+                description="Execute an INSERT, UPDATE, or DELETE query on the SQLite database; other non-SELECT statements such as ANALYZE, VACUUM or PRAGMA also run on the writer",
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "query": {"type": "string", "description": "SQL query to execute"},
+                        "params": PARAMS_SCHEMA,
+                        "timeout_ms": TIMEOUT_SCHEMA,
                     },
                     "required": ["query"],
                 },
             ),
+            types.Tool(
+                name="execute_batch",
+                description="Execute several SQL statements in order inside one transaction; if any statement fails the whole batch is rolled back",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "statements": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "query": {"type": "string", "description": "SQL statement to execute"},
+                                    "params": PARAMS_SCHEMA,
+                                },
+                                "required": ["query"],
+                            },
+                            "description": "Statements to execute in order",
+                        },
+                        "timeout_ms": TIMEOUT_SCHEMA,
+                    },
+                    "required": ["statements"],
+                },
+            ),
             types.Tool(
                 name="create_table",
                 description="Create a new table in the SQLite database",
@@ -273,25 +1188,232 @@ async def main(db_path: str):
                     "required": ["query"],
                 },
             ),
+            types.Tool(
+                name="insert_rows",
+                description="Bulk insert rows into an existing table in a single transaction",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string", "description": "Name of the table to insert into (schema.table for attached databases)"},
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Columns to fill, in row order (optional with csv, which then uses its header line)",
+                        },
+                        "rows": {
+                            "type": "array",
+                            "items": {"type": "array"},
+                            "description": "Rows to insert, each an array of values matching columns",
+                        },
+                        "csv": {"type": "string", "description": "CSV payload to insert instead of rows"},
+                        "chunk_size": {
+                            "type": "integer",
+                            "description": f"Rows per executemany batch (default {DEFAULT_INSERT_CHUNK_SIZE})",
+                            "minimum": 1,
+                        },
+                    },
+                    "required": ["table"],
+                },
+            ),
             types.Tool(
                 name="list_tables",
-                description="List all tables in the SQLite database",
+                description="List all tables in the SQLite database; tables of attached databases are listed as schema.table",
                 inputSchema={
                     "type": "object",
-                    "properties": {},
+                    "properties": {
+                        "format": FORMAT_SCHEMA,
+                    },
                 },
             ),
             types.Tool(
                 name="describe_table",
-                description="Get the schema information for a specific table",
+                description="Get the schema information for a specific table or view",
                 inputSchema={
                     "type": "object",
                     "properties": {
-                        "table_name": {"type": "string", "description": "Name of the table to describe"},
+                        "table_name": {"type": "string", "description": "Name of the table to describe (schema.table for attached databases)"},
+                        "format": FORMAT_SCHEMA,
                     },
                     "required": ["table_name"],
                 },
             ),
+            types.Tool(
+                name="describe_schema",
+                description="Get every table's columns, indexes, foreign keys and estimated row count in one call (views are included with their columns)",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                },
+            ),
+            types.Tool(
+                name="create_search_index",
+                description="Build a full-text (FTS5) search index over text columns of a table, replacing any existing one. Triggers keep it up to date as rows change. Use the search tool instead of LIKE '%term%' scans.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string", "description": "Table to index"},
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Text columns to index",
+                        },
+                        "tokenizer": {
+                            "type": "string",
+                            "enum": list(SEARCH_TOKENIZERS),
+                            "default": DEFAULT_TOKENIZER,
+                            "description": "unicode61 matches whole words, porter also matches English word stems, trigram matches any substring of 3+ characters",
+                        },
+                    },
+                    "required": ["table", "columns"],
+                },
+            ),
+            types.Tool(
+                name="search",
+                description="Full-text search a table indexed with create_search_index. Returns matching rows best first, each with a _snippet of the matching text and its BM25 _score (lower is better).",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string", "description": "Indexed table to search"},
+                        "query": {"type": "string", "description": "Search terms; rows must contain all of them"},
+                        "raw": {
+                            "type": "boolean",
+                            "default": False,
+                            "description": "Treat query as an FTS5 query expression (OR, NOT, \"phrases\", prefix*, NEAR, column:term)",
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": MAX_SEARCH_LIMIT,
+                            "default": DEFAULT_SEARCH_LIMIT,
+                            "description": "Maximum number of matches",
+                        },
+                        "snippet_tokens": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": 64,
+                            "default": DEFAULT_SNIPPET_TOKENS,
+                            "description": "Approximate number of tokens in each snippet",
+                        },
+                        "format": FORMAT_SCHEMA,
+                        "timeout_ms": TIMEOUT_SCHEMA,
+                    },
+                    "required": ["table", "query"],
+                },
+            ),
+            types.Tool(
+                name="profile_table",
+                description="Profile a table's columns in a single scan: null fraction, distinct count (estimated with a HyperLogLog sketch on high-cardinality columns), min/max, most common values and a histogram of numeric values. Use it instead of separate COUNT, MIN/MAX and GROUP BY queries. Pass sample_rows to profile a uniform random sample of a huge table instead.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string", "description": "Table to profile (schema.table for attached databases)"},
+                        "columns": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Columns to profile (default: all)",
+                        },
+                        "top_k": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": MAX_TOP_K,
+                            "default": DEFAULT_TOP_K,
+                            "description": "Number of most common values reported per column",
+                        },
+                        "bins": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": MAX_HISTOGRAM_BINS,
+                            "default": DEFAULT_HISTOGRAM_BINS,
+                            "description": "Number of histogram bins for numeric values",
+                        },
+                        "sample_rows": {
+                            "type": "integer",
+                            "minimum": 0,
+                            "maximum": MAX_SAMPLE_ROWS,
+                            "default": 0,
+                            "description": "Profile a random sample of this many rows instead of every row (0 profiles every row)",
+                        },
+                        "timeout_ms": TIMEOUT_SCHEMA,
+                    },
+                    "required": ["table"],
+                },
+            ),
+            types.Tool(
+                name="snapshot",
+                description="Save a point-in-time copy of the database to a file, using SQLite's online backup API a few pages at a time so reads and writes carry on meanwhile. Returns the file path, size and pages per second. Pass incremental with the name of an earlier snapshot to bring it up to date; it is reused as is if nothing has changed since.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Snapshot name (letters, digits, '-' and '_'); generated if omitted"},
+                        "database": {
+                            "type": "string",
+                            "default": "main",
+                            "description": "Database to copy: main or the name of an attached database",
+                        },
+                        "incremental": {
+                            "type": "boolean",
+                            "default": False,
+                            "description": "Refresh the named earlier snapshot, skipping the copy if the data has not changed",
+                        },
+                        "step_pages": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "default": DEFAULT_SNAPSHOT_STEP_PAGES,
+                            "description": "Pages copied per backup step",
+                        },
+                        "pause_ms": {
+                            "type": "number",
+                            "minimum": 0,
+                            "default": DEFAULT_SNAPSHOT_PAUSE_MS,
+                            "description": "Pause between backup steps, to throttle disk I/O",
+                        },
+                        "timeout_ms": {
+                            "type": "number",
+                            "exclusiveMinimum": 0,
+                            "description": "Give up on the snapshot after this many milliseconds (default: no limit)",
+                        },
+                    },
+                },
+            ),
+            types.Tool(
+                name="explain_query",
+                description="Show SQLite's query plan for a statement without running it",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "SQL statement to explain"},
+                        "params": PARAMS_SCHEMA,
+                    },
+                    "required": ["query"],
+                },
+            ),
+            types.Tool(
+                name="slow_queries",
+                description="List recent statements that exceeded the slow-query threshold, with their query plans",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                },
+            ),
+            types.Tool(
+                name="advise_indexes",
+                description="Suggest CREATE INDEX statements for full table scans, either in the slow-query log or in a given query",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "Analyze this query instead of the slow-query log"},
+                        "params": PARAMS_SCHEMA,
+                    },
+                },
+            ),
+            types.Tool(
+                name="server_stats",
+                description="Report server performance metrics: per-tool latency percentiles, SQLite vs serialization time, connection pool occupancy and cache hit rates",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                },
+            ),
             types.Tool(
                 name="append_insight",
                 description="Add a business insight to the memo",
@@ -310,73 +1432,299 @@ async def main(db_path: str):
         name: str, arguments: dict[str, Any] | None
     ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
         """Handle tool execution requests"""
+        started = time.perf_counter()
+        error = True
         try:
-            if name == "list_tables":
-                results = db._execute_query(
-                    "SELECT name FROM sqlite_master WHERE type='table'"
-                )
-                return [types.TextContent(type="text", text=str(results))]
+            contents = await dispatch_tool(name, arguments)
+            error = False
+        except sqlite3.Error as e:
+            contents = [types.TextContent(type="text", text=f"Database error: {str(e)}")]
+        except Exception as e:
+            contents = [types.TextContent(type="text", text=f"Error: {str(e)}")]
+        db.metrics.record_tool(
+            name, time.perf_counter() - started, _content_bytes(contents), error
+        )
+        return contents
+
+    async def dispatch_tool(
+        name: str, arguments: dict[str, Any] | None
+    ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """Execute a tool, raising on failure"""
+        # export_query takes its own file formats, checked by the export store
+        fmt = check_format((arguments or {}).get("format")) if name != "export_query" else None
+
+        if name == "list_tables":
+            names = await db.executor.run(db.catalog.table_names)
+            rows = [(table,) for table in names]
+            return [types.TextContent(type="text", text=db.encode(name, ["name"], rows, fmt))]
+
+        elif name == "describe_table":
+            if not arguments or "table_name" not in arguments:
+                raise ValueError("Missing table_name argument")
+            table = await db.executor.run(db.catalog.table, arguments["table_name"])
+            return [types.TextContent(type="text", text=db.encode(name, TABLE_INFO_COLUMNS, table.columns, fmt))]
+
+        elif name == "describe_schema":
+            tables = await db.executor.run(db.catalog.describe_all)
+            return [types.TextContent(type="text", text=json.dumps({"tables": tables}, separators=(",", ":")))]
+
+        elif name == "server_stats":
+            return [types.TextContent(type="text", text=json.dumps(db.stats()))]
 
-            elif name == "describe_table":
-                if not arguments or "table_name" not in arguments:
-                    raise ValueError("Missing table_name argument")
-                results = db._execute_query(
-                    f"PRAGMA table_info({arguments['table_name']})"
+        elif name == "slow_queries":
+            entries = [entry.to_dict() for entry in db.slow_log.entries()]
+            return [types.TextContent(type="text", text=json.dumps({"slow_queries": entries}))]
+
+        elif name == "advise_indexes":
+            advice = await db.executor.run(
+                db._advise_indexes,
+                (arguments or {}).get("query"),
+                _query_params(arguments or {}),
+            )
+            return [types.TextContent(type="text", text=json.dumps(advice))]
+
+        elif name == "snapshot":
+            arguments = arguments or {}
+            # Snapshots are not held to the query time budget, only to an explicit timeout_ms
+            timeout_ms = arguments.get("timeout_ms")
+            guard = QueryGuard(
+                QueryBudget(0, 0, 0).limit(float(timeout_ms) if timeout_ms is not None else None)
+            )
+            info = await db.run_guarded(
+                guard,
+                db._snapshot,
+                arguments.get("name"),
+                arguments.get("database", "main"),
+                bool(arguments.get("incremental", False)),
+                int(arguments.get("step_pages", DEFAULT_SNAPSHOT_STEP_PAGES)),
+                float(arguments.get("pause_ms", DEFAULT_SNAPSHOT_PAUSE_MS)),
+                guard,
+            )
+            return [types.TextContent(type="text", text=json.dumps(info.to_dict()))]
+
+        elif name == "append_insight":
+            if not arguments or "insight" not in arguments:
+                raise ValueError("Missing insight argument")
+
+            await db.executor.run(db.memo.append, arguments["insight"])
+
+            # Notify clients that the memo resource has changed
+            await server.request_context.session.send_resource_updated(AnyUrl("memo://insights"))
+
+            return [types.TextContent(type="text", text="Insight added to memo")]
+
+        if not arguments:
+            raise ValueError("Missing arguments")
+
+        if name == "read_query":
+            guard = _call_guard(db, arguments)
+            if arguments.get("cursor") or "page_size" in arguments:
+                query = arguments.get("query")
+                if not arguments.get("cursor"):
+                    if not query:
+                        raise ValueError("Missing query argument")
+                    if not _is_read_statement(query):
+                        raise ValueError("Only SELECT (or WITH ... SELECT) queries are allowed for read_query")
+                page_size = int(arguments.get("page_size", DEFAULT_PAGE_SIZE))
+                columns, rows, next_cursor = await db.read_page(
+                    query,
+                    params=_query_params(arguments),
+                    cursor=arguments.get("cursor"),
+                    page_size=page_size,
+                    guard=guard,
                 )
-                return [types.TextContent(type="text", text=str(results))]
+                return _page_contents(db, name, columns, rows, page_size, next_cursor, fmt, guard)
+            if "query" not in arguments:
+                raise ValueError("Missing query argument")
+            if not _is_read_statement(arguments["query"]):
+                raise ValueError("Only SELECT (or WITH ... SELECT) queries are allowed for read_query")
+            columns, rows = await db.fetch_rows(arguments["query"], _query_params(arguments), guard)
+            contents = [types.TextContent(type="text", text=db.encode(name, columns, rows, fmt))]
+            if guard.reason is not None:
+                contents.append(types.TextContent(type="text", text=json.dumps(guard.status(len(rows)))))
+            return contents
 
-            elif name == "append_insight":
-                if not arguments or "insight" not in arguments:
-                    raise ValueError("Missing insight argument")
+        elif name == "export_query":
+            if "query" not in arguments:
+                raise ValueError("Missing query argument")
+            if not _is_read_statement(arguments["query"]):
+                raise ValueError("Only SELECT (or WITH ... SELECT) queries can be exported")
+            export_format = arguments.get("format", "csv")
+            if export_format not in EXPORT_FORMATS:
+                raise ValueError(f"Unknown export format: {export_format}. Expected one of: {', '.join(EXPORT_FORMATS)}")
+            guard = _call_guard(db, arguments)
+            info = await db.run_guarded(
+                guard,
+                db._export,
+                arguments["query"],
+                _query_params(arguments),
+                export_format,
+                arguments.get("name"),
+                guard,
+            )
+            db.metrics.record_tool_rows(name, info.rows or 0)
+            return [types.TextContent(type="text", text=json.dumps(info.to_dict(db.exports.chunk_bytes)))]
 
-                db.insights.append(arguments["insight"])
-                _ = db._synthesize_memo()
+        elif name == "create_search_index":
+            if "table" not in arguments:
+                raise ValueError("Missing table argument")
+            result = await db.executor.run(
+                db._create_search_index,
+                arguments["table"],
+                list(arguments.get("columns") or []),
+                arguments.get("tokenizer", DEFAULT_TOKENIZER),
+            )
+            return [types.TextContent(type="text", text=json.dumps(result))]
 
-                # Notify clients that the memo resource has changed
-                await server.request_context.session.send_resource_updated(AnyUrl("memo://insights"))
+        elif name == "search":
+            if "table" not in arguments or "query" not in arguments:
+                raise ValueError("Missing table or query argument")
+            guard = _call_guard(db, arguments)
+            columns, rows = await db.search(
+                arguments["table"],
+                arguments["query"],
+                limit=int(arguments.get("limit", DEFAULT_SEARCH_LIMIT)),
+                raw=bool(arguments.get("raw", False)),
+                snippet_tokens=int(arguments.get("snippet_tokens", DEFAULT_SNIPPET_TOKENS)),
+                guard=guard,
+            )
+            contents = [types.TextContent(type="text", text=db.encode(name, columns, rows, fmt))]
+            if guard.reason is not None:
+                contents.append(types.TextContent(type="text", text=json.dumps(guard.status(len(rows)))))
+            return contents
 
-                return [types.TextContent(type="text", text="Insight added to memo")]
+        elif name == "profile_table":
+            if "table" not in arguments:
+                raise ValueError("Missing table argument")
+            guard = _call_guard(db, arguments)
+            result = await db.profile(
+                arguments["table"],
+                list(arguments.get("columns") or []),
+                top_k=int(arguments.get("top_k", DEFAULT_TOP_K)),
+                bins=int(arguments.get("bins", DEFAULT_HISTOGRAM_BINS)),
+                sample_rows=int(arguments.get("sample_rows", 0)),
+                guard=guard,
+            )
+            contents = [types.TextContent(type="text", text=json.dumps(result))]
+            if guard.reason is not None:
+                contents.append(types.TextContent(type="text", text=json.dumps(guard.status(result["rows_scanned"]))))
+            return contents
 
-            if not arguments:
-                raise ValueError("Missing arguments")
+        elif name == "write_query":
+            if arguments["query"].strip().upper().startswith("SELECT"):
+                raise ValueError("SELECT queries are not allowed for write_query")
+            results = await db.execute(
+                arguments["query"], _query_params(arguments), _call_guard(db, arguments)
+            )
+            return [types.TextContent(type="text", text=str(results))]
 
-            if name == "read_query":
-                if not arguments["query"].strip().upper().startswith("SELECT"):
-                    raise ValueError("Only SELECT queries are allowed for read_query")
-                results = db._execute_query(arguments["query"])
-                return [types.TextContent(type="text", text=str(results))]
+        elif name == "insert_rows":
+            if "table" not in arguments:
+                raise ValueError("Missing table argument")
+            columns, rows = _insert_source(arguments)
+            result = await db.executor.run(
+                db._insert_rows,
+                arguments["table"],
+                columns,
+                rows,
+                int(arguments.get("chunk_size", DEFAULT_INSERT_CHUNK_SIZE)),
+            )
+            return [types.TextContent(type="text", text=json.dumps(result))]
 
-            elif name == "write_query":
-                if arguments["query"].strip().upper().startswith("SELECT"):
-                    raise ValueError("SELECT queries are not allowed for write_query")
-                results = db._execute_query(arguments["query"])
-                return [types.TextContent(type="text", text=str(results))]
+        elif name == "explain_query":
+            if "query" not in arguments:
+                raise ValueError("Missing query argument")
+            plan = await db.executor.run(
+                db._explain, arguments["query"], _query_params(arguments)
+            )
+            return [types.TextContent(type="text", text="\n".join(plan))]
 
-            elif name == "create_table":
-                if not arguments["query"].strip().upper().startswith("CREATE TABLE"):
-                    raise ValueError("Only CREATE TABLE statements are allowed")
-                db._execute_query(arguments["query"])
-                return [types.TextContent(type="text", text="Table created successfully")]
+        elif name == "execute_batch":
+            batch = _batch_statements(arguments)
+            started = time.perf_counter()
+            guard = _call_guard(db, arguments)
+            affected = await db.run_guarded(guard, db._execute_batch, batch, guard)
+            result = {
+                "statements": [
+                    {"index": index, "affected_rows": count}
+                    for index, count in enumerate(affected)
+                ],
+                "seconds": round(time.perf_counter() - started, 6),
+            }
+            return [types.TextContent(type="text", text=json.dumps(result))]
 
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+        elif name == "create_table":
+            if not arguments["query"].strip().upper().startswith("CREATE TABLE"):
+                raise ValueError("Only CREATE TABLE statements are allowed")
+            await db.execute(arguments["query"])
+            return [types.TextContent(type="text", text="Table created successfully")]
 
-        except sqlite3.Error as e:
-            return [types.TextContent(type="text", text=f"Database error: {str(e)}")]
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"Error: {str(e)}")]
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.info("Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="sqlite",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+
+    return server
+
+
+async def main(
+    db_path: str,
+    readers: int = DEFAULT_READERS,
+    cache_size_kib: int = DEFAULT_CACHE_SIZE_KIB,
+    max_concurrency: int | None = None,
+    max_queued: int = DEFAULT_MAX_QUEUED,
+    statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE,
+    result_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+    slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+    slow_log_size: int = DEFAULT_SLOW_LOG_SIZE,
+    mmap_size: int = DEFAULT_MMAP_SIZE,
+    query_timeout_ms: float = DEFAULT_QUERY_TIMEOUT_MS,
+    max_vm_steps: int = DEFAULT_MAX_VM_STEPS,
+    max_result_rows: int = DEFAULT_MAX_RESULT_ROWS,
+    data_dir: str | None = None,
+    attach: dict[str, str] | None = None,
+    write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+    write_flush_ms: float = DEFAULT_WRITE_FLUSH_MS,
+    snapshot_dir: str | None = None,
+):
+    logger.info(f"Starting SQLite MCP Server with DB path: {db_path}")
+    for name, path in (attach or {}).items():
+        logger.info(f"Attaching {path} as {name}")
+
+    db = SqliteDatabase(
+        db_path,
+        readers=readers,
+        cache_size_kib=cache_size_kib,
+        max_concurrency=max_concurrency,
+        max_queued=max_queued,
+        statement_cache_size=statement_cache_size,
+        result_cache_bytes=result_cache_bytes,
+        slow_query_ms=slow_query_ms,
+        slow_log_size=slow_log_size,
+        mmap_size=mmap_size,
+        query_timeout_ms=query_timeout_ms,
+        max_vm_steps=max_vm_steps,
+        max_result_rows=max_result_rows,
+        data_dir=data_dir,
+        attach=attach,
+        write_batch_size=write_batch_size,
+        write_flush_ms=write_flush_ms,
+        snapshot_dir=snapshot_dir,
+    )
+    server = create_server(db)
+
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            logger.info("Server running with stdio transport")
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="sqlite",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        db.close()
@@ -0,0 +1,200 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+from .catalog import TableSchema, quote_identifier
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_SLOW_QUERY_MS = 200.0
+DEFAULT_SLOW_LOG_SIZE = 100
+
+# Plan rows that read a whole table; "SCAN t USING INDEX" walks an index instead
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$")
+# SQLite builds a throwaway index when it wishes one existed
+_AUTOMATIC_INDEX = re.compile(
+    r"^SEARCH (?:TABLE )?(\w+)(?: AS \w+)? USING AUTOMATIC (?:COVERING |PARTIAL )*INDEX \((.+)\)$"
+)
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+((?:(?:\"[^\"]+\"|\w+)\.)?(?:\"[^\"]+\"|\[[^\]]+\]|\w+))"
+    r"(?:\s+(?:AS\s+)?(\w+))?",
+    re.IGNORECASE,
+)
+_PREDICATE = re.compile(
+    r"(?:(\w+)\.)?\"?(\w+)\"?\s*(=|==|IN\b|IS\b|<=|>=|<|>|BETWEEN\b|LIKE\b)",
+    re.IGNORECASE,
+)
+_NOT_ALIASES = {
+    "WHERE", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "NATURAL", "OUTER",
+    "ON", "USING", "GROUP", "ORDER", "LIMIT", "HAVING", "UNION", "EXCEPT",
+    "INTERSECT", "WINDOW", "SET", "VALUES", "RETURNING",
+}
+
+
+@dataclass
+class SlowQuery:
+    query: str
+    params: str | None
+    seconds: float
+    rows: int
+    plan: list[str] = field(default_factory=list)
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "query": self.query,
+            "params": self.params,
+            "ms": round(self.seconds * 1000, 3),
+            "rows": self.rows,
+            "plan": self.plan,
+            "timestamp": self.timestamp,
+        }
+
+
+class SlowQueryLog:
+    """Ring buffer of statements slower than a threshold, with their query plans"""
+
+    def __init__(
+        self,
+        threshold_ms: float = DEFAULT_SLOW_QUERY_MS,
+        capacity: int = DEFAULT_SLOW_LOG_SIZE,
+    ):
+        self.threshold = threshold_ms / 1000
+        self._entries: deque[SlowQuery] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def is_slow(self, seconds: float) -> bool:
+        return self.threshold >= 0 and seconds >= self.threshold
+
+    def record(self, entry: SlowQuery) -> None:
+        logger.info(f"Slow query ({entry.seconds * 1000:.1f} ms): {entry.query}")
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def format_plan(rows: Sequence[Sequence[Any]]) -> list[str]:
+    """Render EXPLAIN QUERY PLAN rows (id, parent, notused, detail) as an indented tree"""
+    depth: dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        level = depth.get(parent, -1) + 1
+        depth[node_id] = level
+        lines.append("  " * level + str(detail))
+    return lines
+
+
+def _table_aliases(query: str) -> dict[str, str]:
+    """Map each alias (and bare table name) used in FROM/JOIN clauses to its table.
+
+    Tables of attached databases map to their 'schema.table' catalog name,
+    since query plans name them without the schema.
+    """
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(query):
+        parts = [part.strip('"[]') for part in re.findall(r'"[^"]+"|\[[^\]]+\]|\w+', table)]
+        if len(parts) == 2 and parts[0].lower() == "main":
+            parts = parts[1:]
+        table = ".".join(parts)
+        aliases[parts[-1].lower()] = table
+        if alias and alias.upper() not in _NOT_ALIASES:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+def advise_indexes(
+    entries: Sequence[SlowQuery],
+    lookup_table: Callable[[str], TableSchema | None],
+) -> list[dict[str, Any]]:
+    """Suggest CREATE INDEX statements for full table scans in logged plans.
+
+    Candidate columns come from SQLite's own automatic indexes when it built
+    one, otherwise from comparison predicates in the query that reference the
+    scanned table. Equality columns are ordered before range columns.
+    """
+    suggestions: dict[tuple[str, tuple[str, ...]], dict[str, Any]] = {}
+    for entry in entries:
+        aliases = _table_aliases(entry.query)
+        for line in entry.plan:
+            detail = line.strip()
+            scan = _FULL_SCAN.match(detail)
+            automatic = _AUTOMATIC_INDEX.match(detail)
+            if automatic:
+                alias = automatic.group(1)
+                columns = [
+                    part.split("=")[0].split(">")[0].split("<")[0].strip()
+                    for part in automatic.group(2).split(" AND ")
+                ]
+            elif scan:
+                alias = scan.group(2) or scan.group(1)
+                columns = None
+            else:
+                continue
+
+            schema = lookup_table(aliases.get(alias.lower(), alias))
+            if schema is None or schema.is_view or not schema.column_names:
+                continue
+            table = schema.name
+            known = schema.column_names
+            if columns is None:
+                columns = _predicate_columns(entry.query, alias, table, known)
+            columns = [col for col in columns if col in known]
+            if not columns:
+                continue
+
+            key = (table, tuple(columns))
+            suggestion = suggestions.setdefault(
+                key,
+                {
+                    "table": table,
+                    "columns": columns,
+                    "statement": _index_statement(schema, columns),
+                    "queries": 0,
+                    "total_ms": 0.0,
+                    "example": entry.query,
+                },
+            )
+            suggestion["queries"] += 1
+            suggestion["total_ms"] = round(suggestion["total_ms"] + entry.seconds * 1000, 3)
+    return sorted(suggestions.values(), key=lambda s: s["total_ms"], reverse=True)
+
+
+def _predicate_columns(query: str, alias: str, table: str, known: list[str]) -> list[str]:
+    """Columns of the scanned table compared in WHERE/ON clauses, equality first"""
+    lowered = {col.lower(): col for col in known}
+    refs = {alias.lower(), table.lower()}
+    where = re.split(r"\b(?:WHERE|ON)\b", query, flags=re.IGNORECASE)
+    equality: list[str] = []
+    ranges: list[str] = []
+    for clause in where[1:]:
+        for qualifier, column, op in _PREDICATE.findall(clause):
+            if qualifier and qualifier.lower() not in refs:
+                continue
+            name = lowered.get(column.lower())
+            if name is None:
+                continue
+            bucket = equality if op.upper() in ("=", "==", "IN", "IS") else ranges
+            if name not in equality and name not in ranges:
+                bucket.append(name)
+    # A B-tree index can only use one range column, after the equality ones
+    return equality + ranges[:1]
+
+
+def _index_statement(table: TableSchema, columns: list[str]) -> str:
+    name = re.sub(r"\W+", "_", f"idx_{table.table_name}_{'_'.join(columns)}")
+    if table.schema != "main":
+        # The index lives in the table's database, named by schema; ON takes the bare table
+        name = f"{quote_identifier(table.schema)}.{name}"
+    cols = ", ".join(quote_identifier(col) for col in columns)
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {quote_identifier(table.table_name)} ({cols})"
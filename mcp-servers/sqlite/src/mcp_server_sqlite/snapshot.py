@@ -0,0 +1,140 @@
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Hashable
+
+from .budget import QueryGuard
+from .catalog import quote_identifier
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_SNAPSHOT_STEP_PAGES = 256
+DEFAULT_SNAPSHOT_PAUSE_MS = 0.0
+
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$")
+_SUFFIX = ".db"
+_PART_SUFFIX = ".part"
+
+
+@dataclass
+class SnapshotInfo:
+    name: str
+    path: Path
+    database: str
+    pages: int = 0
+    page_size: int = 0
+    steps: int = 0
+    seconds: float = 0.0
+    unchanged: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "path": str(self.path),
+            "database": self.database,
+            "bytes": self.path.stat().st_size,
+            "pages": self.pages,
+            "page_size": self.page_size,
+            "pages_copied": 0 if self.unchanged else self.pages,
+            "steps": self.steps,
+            "seconds": round(self.seconds, 6),
+            "pages_per_second": round(self.pages / self.seconds) if self.seconds and not self.unchanged else None,
+            "unchanged": self.unchanged,
+        }
+
+
+class SnapshotStore:
+    """Point-in-time copies of a database, taken online with SQLite's backup API.
+
+    The copy is made from its own read-only connection inside one read
+    transaction, a few pages per backup step. In WAL mode that transaction
+    blocks neither readers nor writers, and it pins the snapshot so commits
+    made meanwhile do not force the backup to restart. Each file is written
+    beside its target and renamed, so a partial snapshot is never visible.
+    """
+
+    def __init__(self, snapshot_dir: str | Path):
+        self.snapshot_dir = Path(snapshot_dir).expanduser()
+        # Database version each snapshot was taken at, for incremental follow-ups
+        self._versions: dict[str, tuple[str, Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> Path:
+        if not _NAME.match(name):
+            raise ValueError("Snapshot name may only contain letters, digits, '-' and '_'")
+        return self.snapshot_dir / f"{name}{_SUFFIX}"
+
+    def current(self, name: str, database: str, version: Hashable) -> SnapshotInfo | None:
+        """The existing snapshot if it was taken of database at this exact version"""
+        path = self.path(name)
+        with self._lock:
+            if self._versions.get(name) != (database, version) or not path.is_file():
+                return None
+        with closing(sqlite3.connect(path)) as conn:
+            pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return SnapshotInfo(name, path, database, pages, page_size, unchanged=True)
+
+    def take(
+        self,
+        source: sqlite3.Connection,
+        guard: QueryGuard,
+        version: Hashable,
+        name: str | None = None,
+        database: str = "main",
+        step_pages: int = DEFAULT_SNAPSHOT_STEP_PAGES,
+        pause_ms: float = DEFAULT_SNAPSHOT_PAUSE_MS,
+    ) -> SnapshotInfo:
+        """Copy one database of a connection into a snapshot file, step_pages pages at a time"""
+        if step_pages < 1:
+            raise ValueError("step_pages must be at least 1")
+        if pause_ms < 0:
+            raise ValueError("pause_ms must not be negative")
+        if name is None:
+            name = time.strftime("snapshot-%Y%m%d-%H%M%S-") + secrets.token_hex(3)
+        path = self.path(name)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + _PART_SUFFIX)
+        partial.unlink(missing_ok=True)
+
+        info = SnapshotInfo(name, path, database)
+
+        def progress(status: int, remaining: int, total: int) -> None:
+            info.steps += 1
+            info.pages = total
+            if guard.check():
+                raise ValueError(f"{guard.describe()}; the snapshot was discarded")
+            if pause_ms and remaining:
+                time.sleep(pause_ms / 1000)
+
+        started = time.perf_counter()
+        try:
+            with guard.watch(source):
+                # Hold one read transaction so every step copies the same snapshot
+                source.execute("BEGIN")
+                try:
+                    source.execute(f"SELECT 1 FROM {quote_identifier(database)}.sqlite_master LIMIT 1").fetchall()
+                    with closing(sqlite3.connect(partial)) as target:
+                        source.backup(target, pages=step_pages, progress=progress, name=database)
+                        info.page_size = target.execute("PRAGMA page_size").fetchone()[0]
+                        info.pages = target.execute("PRAGMA page_count").fetchone()[0]
+                finally:
+                    source.execute("ROLLBACK")
+            os.replace(partial, path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        info.seconds = time.perf_counter() - started
+        with self._lock:
+            self._versions[name] = (database, version)
+        logger.debug(
+            f"Snapshot of {database} to {path}: {info.pages} pages in {info.steps} steps, {info.seconds:.3f}s"
+        )
+        return info
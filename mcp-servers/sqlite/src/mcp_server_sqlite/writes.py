@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .budget import QueryGuard
+from .executor import QueryExecutor
+
+logger = logging.getLogger('mcp_sqlite_server')
+
+DEFAULT_WRITE_BATCH_SIZE = 64
+DEFAULT_WRITE_FLUSH_MS = 1.0
+
+
+@dataclass
+class PendingWrite:
+    query: str
+    params: Any
+    guard: QueryGuard
+    future: asyncio.Future
+    enqueued: float
+    affected: int | None = None
+    error: BaseException | None = None
+
+
+class WriteQueue:
+    """Group commit for single-statement writes.
+
+    Writes submitted close together are committed in one transaction on the
+    writer connection, so concurrent callers share one commit instead of
+    paying for one each. The commit function runs every write of a batch
+    under its own savepoint and records its affected-row count or error on
+    it, so a failing statement is rolled back alone and only its caller
+    sees the error. A batch is flushed once max_batch writes are waiting or
+    the oldest has waited max_delay_ms; the next batch collects while the
+    previous one commits.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[list[PendingWrite]], None],
+        executor: QueryExecutor,
+        max_batch: int = DEFAULT_WRITE_BATCH_SIZE,
+        max_delay_ms: float = DEFAULT_WRITE_FLUSH_MS,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        if max_delay_ms < 0:
+            raise ValueError("max_delay_ms must not be negative")
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._commit = commit
+        self._executor = executor
+        self._pending: list[PendingWrite] = []
+        self._arrived = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+        self.writes = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.largest_batch = 0
+
+    async def submit(self, query: str, params: Any, guard: QueryGuard) -> int:
+        """Queue a write and wait until the transaction containing it has committed"""
+        loop = asyncio.get_running_loop()
+        write = PendingWrite(query, params, guard, loop.create_future(), loop.time())
+        self._pending.append(write)
+        self._arrived.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_loop())
+        try:
+            return await write.future
+        except asyncio.CancelledError:
+            # Skipped if still queued; interrupted and rolled back if already running
+            guard.cancel()
+            raise
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            deadline = self._pending[0].enqueued + self.max_delay
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            batch = [w for w in self._pending[:self.max_batch] if not w.future.done()]
+            del self._pending[:self.max_batch]
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: list[PendingWrite]) -> None:
+        try:
+            await self._executor.run(self._commit, batch)
+        except Exception as e:
+            # The transaction as a whole failed, so none of its writes took effect
+            logger.error(f"Group commit of {len(batch)} writes failed: {e}")
+            self.failed_batches += 1
+            for write in batch:
+                write.error = e
+        self._record(len(batch))
+        for write in batch:
+            if write.future.done():
+                continue
+            if write.error is not None:
+                write.future.set_exception(write.error)
+            else:
+                write.future.set_result(write.affected)
+
+    def _record(self, size: int) -> None:
+        self.writes += size
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, size)
+        if size > 1:
+            logger.debug(f"Group-committed {size} writes")
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of group-commit activity"""
+        return {
+            "max_batch": self.max_batch,
+            "flush_ms": self.max_delay * 1000,
+            "pending": len(self._pending),
+            "writes": self.writes,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "largest_batch": self.largest_batch,
+            "mean_batch": self.writes / self.batches if self.batches else 0.0,
+        }